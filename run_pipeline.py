@@ -16,31 +16,85 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import argparse
+import copy
+import importlib
+import os
 import sys
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 
 # --- CORE IMPORTS ---
+# Lightweight only. Each phase imports its own module when selected, so e.g.
+# --action download never pays for pandas/matplotlib/rasterio start-up.
 from src.config_loader import load_config
-from src.met_downloads import ERA5Downloader
-from src.met_processor import SurfaceProcessor, UpperAirProcessor
 from src.setup_inventory import setup_inventory
 
-# --- RUNNER IMPORTS (Standardized) ---
-# If these fail, we want the script to crash immediately so we know why.
-try:
+# Phases whose years are fully independent (separate files and sandboxes per year)
+PARALLEL_ACTIONS = ('met_process', 'aermet', 'run_model')
+
+# Module and class each phase depends on
+REQUIRED_RUNNERS = {
+    'download': ('src.met_downloads', 'ERA5Downloader'),
+    'met_process': ('src.met_processor', 'SurfaceProcessor'),
+    'aermet': ('src.aermet_runner', 'AermetRunner'),
+    'run_model': ('src.aermod_runner', 'AermodRunner'),
+    'visualize': ('src.plotter', 'AermodPlotter'),
+}
+
+# Met processors only depend on the station, so build them once per process
+_MET_PROCESSORS = {}
+
+def _get_met_processors(cfg):
+    from src.met_processor import SurfaceProcessor, UpperAirProcessor
+    station = cfg['project'].get('station_name', 'Station')
+    if station not in _MET_PROCESSORS:
+        _MET_PROCESSORS[station] = (SurfaceProcessor(cfg), UpperAirProcessor(cfg))
+    return _MET_PROCESSORS[station]
+
+def _do_met_process(cfg, year):
+    print(f"[PHASE 2] Processing {year}...")
+    lat = cfg['location']['latitude']
+    lon = cfg['location']['longitude']
+    sfc_proc, ua_proc = _get_met_processors(cfg)
+    sfc_proc.process(year, lat, lon)
+    ua_proc.process(year, lat, lon)
+
+def _do_aermet(cfg, year):
     from src.aermet_runner import AermetRunner
+    print(f"[PHASE 3] Running AERMET for {year}...")
+    runner = AermetRunner(cfg)
+    runner.run()
+
+def _do_run_model(cfg, year):
     from src.aermod_runner import AermodRunner
-    from src.plotter import AermodPlotter
-except ImportError as e:
-    print(f"[WARNING] Could not import one of the runners: {e}")
-    # We continue, because maybe the user is only running --action download
+    print(f"[PHASE 4] Running AERMOD for {year}...")
+    model_runner = AermodRunner(cfg)
+    model_runner.run()
 
-# --- GUI IMPORT (Optional) ---
-try:
-    from src.gui_helper import launch_gui
-except ImportError:
-    pass
+def _do_visualize(cfg, year):
+    from src.plotter import AermodPlotter
+    print(f"[PHASE 5] Visualizing {year}...")
+    plotter = AermodPlotter(cfg)
+    plotter.run()
+
+# Per-year phase handlers, keyed by --action
+YEAR_ACTIONS = {
+    'met_process': _do_met_process,
+    'aermet': _do_aermet,
+    'run_model': _do_run_model,
+    'visualize': _do_visualize,
+}
+
+def _run_year(cfg, year, action, overwrite=False):
+    """
+    Executes a single pipeline phase for one year.
+    Kept at module level so it can be pickled for worker processes.
+    """
+    cfg['project']['year'] = year
+    cfg['overwrite'] = overwrite
+    YEAR_ACTIONS[action](cfg, year)
 
 def main():
     parser = argparse.ArgumentParser(description="ATAQ AERMOD: Multi-Year Pipeline")
@@ -51,16 +105,19 @@ def main():
     
     parser.add_argument('--overwrite', action='store_true', help='Force re-download/re-process of existing data')
     parser.add_argument('--gui', action='store_true', help='Launch the Configuration GUI Helper')
+    parser.add_argument('--workers', type=int, default=None, help='Max parallel worker processes for years/pollutants (default: CPU count, 1 = sequential)')
     
     args = parser.parse_args()
 
     # GUI CHECK
     if args.gui:
         print(">>> Launching GUI Helper...")
-        if 'launch_gui' in globals():
-            launch_gui()
-        else:
+        try:
+            from src.gui_helper import launch_gui
+        except ImportError:
             print("[ERROR] GUI module not found (src/gui_helper.py).")
+            return
+        launch_gui()
         return 
 
     if not args.action:
@@ -76,10 +133,6 @@ def main():
     else:
         years = [cfg['project']['year']]
 
-    lat = cfg['location']['latitude']
-    lon = cfg['location']['longitude']
-    buffer = cfg['location'].get('area_buffer', 0.25)
-
     print(f"Project: {cfg['project']['name']}")
     print(f"Years to Process: {years}")
 
@@ -101,54 +154,54 @@ def main():
     if args.action == 'setup_inventory':
         print(f"\n Building Inventory Templates via setup_inventories.py...")
         setup_inventory(cfg)
+        return
+
+    # ==========================================
+    # IMPORT THE SELECTED PHASE (Once, before any worker starts)
+    # ==========================================
+    if args.action in REQUIRED_RUNNERS:
+        module_name, cls_name = REQUIRED_RUNNERS[args.action]
+        try:
+            importlib.import_module(module_name)
+        except ImportError as e:
+            print(f"[ERROR] {cls_name} could not be imported. Check {module_name.replace('.', '/')}.py: {e}")
+            return
+
+    # ==========================================
+    # DOWNLOAD (All years queued together)
+    # ==========================================
+    if args.action == 'download':
+        from src.met_downloads import ERA5Downloader
+        print(f"[PHASE 1] Downloading {years}...")
+        lat = cfg['location']['latitude']
+        lon = cfg['location']['longitude']
+        buffer = cfg['location'].get('area_buffer', 0.25)
+        st_name = cfg['project'].get('station_name', 'Station')
+        downloader = ERA5Downloader(overwrite=args.overwrite)
+        downloader.download_all(years, st_name, lat, lon, buffer)
+        return
+
     # ==========================================
     # LOOP THROUGH YEARS
     # ==========================================
-    for year in years:
-        cfg['project']['year'] = year
-
-        #   DOWNLOAD
-        if args.action == 'download':
-            print(f"[PHASE 1] Downloading {year}...")
-            st_name = cfg['project'].get('station_name', 'Station')
-            downloader = ERA5Downloader(overwrite=args.overwrite)
-            downloader.download_surface(year, st_name, lat, lon, buffer)
-            downloader.download_upper_air(year, st_name, lat, lon, buffer)
-
-        #  PROCESS
-        elif args.action == 'met_process':
-            print(f"[PHASE 2] Processing {year}...")
-            sfc_proc = SurfaceProcessor(cfg)
-            sfc_proc.process(year, lat, lon)
-            ua_proc = UpperAirProcessor(cfg)
-            ua_proc.process(year, lat, lon)
-
-        #  AERMET
-        elif args.action == 'aermet':
-            print(f"[PHASE 3] Running AERMET for {year}...")
-            if 'AermetRunner' not in globals():
-                print("[ERROR] AermetRunner class not found. Check src/aermet_runner.py")
-                return
-            runner = AermetRunner(cfg)
-            runner.run()
-
-        # RUN AERMOD
-        elif args.action == 'run_model':
-            print(f"[PHASE 4] Running AERMOD for {year}...")
-            if 'AermodRunner' not in globals():
-                print("[ERROR] AermodRunner class not found. Check src/aermod_runner.py")
-                return
-            model_runner = AermodRunner(cfg)
-            model_runner.run()
-
-        # VISUALIZE
-        elif args.action == 'visualize':
-            print(f"[PHASE 5] Visualizing {year}...")
-            if 'AermodPlotter' not in globals():
-                print("[ERROR] AermodPlotter class not found. Check src/plotter.py")
-                return
-            plotter = AermodPlotter(cfg)
-            plotter.run()
+    # The YAML is parsed once above; each year gets its own copy of the parsed
+    # dict (workers receive it pickled) so per-year edits never leak across years.
+    cfgs = [copy.deepcopy(cfg) for _ in years]
+
+    cpu_budget = args.workers or os.cpu_count() or 1
+    workers = min(len(years), cpu_budget)
+    if args.action in PARALLEL_ACTIONS and workers > 1:
+        print(f"Running {len(years)} years across {workers} worker processes...")
+        # Share the remaining cores with any pool a year starts itself (e.g. per pollutant)
+        for year_cfg in cfgs:
+            year_cfg['max_workers'] = max(1, cpu_budget // workers)
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            for _ in ex.map(_run_year, cfgs, years, repeat(args.action), repeat(args.overwrite)):
+                pass
+    else:
+        for year_cfg, year in zip(cfgs, years):
+            year_cfg['max_workers'] = cpu_budget
+            _run_year(year_cfg, year, args.action, args.overwrite)
 
 if __name__ == "__main__":
     main()
@@ -15,12 +15,57 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import io
 import os
-import shutil
 import subprocess
-import pandas as pd
 from pathlib import Path
 import platform
+from src.file_utils import link_or_copy, replace_file
+
+# AERMET ONSITE columns (CSV header -> READ keyword order) and their fixed-width layout
+ONSITE_COLUMNS = ['Year', 'Month', 'Day', 'Hour', 'Temp_C', 'DewPt_C', 'Press_mb',
+                  'Precip_mm', 'WindSpd_ms', 'WindDir_deg', 'CloudCover']
+ONSITE_FMT = "%4d %2d %2d %2d %6.1f %6.1f %7.1f %6.2f %6.2f %6.1f %2d"
+ONSITE_DTYPES = {
+    'Year': 'int32', 'Month': 'int8', 'Day': 'int8', 'Hour': 'int8',
+    'Temp_C': 'float32', 'DewPt_C': 'float32', 'Press_mb': 'float32', 'Precip_mm': 'float32',
+    'WindSpd_ms': 'float32', 'WindDir_deg': 'float32', 'CloudCover': 'int8'
+}
+
+# Static AERMET control file; only the bracketed fields change between runs
+AERMET_INP_TEMPLATE = """\
+JOB
+   REPORT     aermet.rpt
+   MESSAGES   aermet.msg
+
+UPPERAIR
+   DATA       {ua_filename} IGRA
+   EXTRACT    ua_extract.dat
+   XDATES     {start_date} TO {end_date}
+   LOCATION   {ua_id} {lat_lon_str} -2 {elev}
+   QAOUT      ua_qa.out
+
+ONSITE
+   OSHEIGHTS  2.0 10.0
+   DATA       {onsite_filename}
+   LOCATION   {surf_id} {lat_lon_str} -2 {elev}
+   XDATES     {start_date} TO {end_date}
+   QAOUT      onsite_qa.out
+   THRESHOLD  0.5
+   READ  1  OSYR OSMO OSDY OSHR TT01 DP01 PRES PRCP WS02 WD02 TSKC
+   FORMAT    1  FREE
+
+METPREP
+   XDATES     {start_date} TO {end_date}
+   METHOD     WIND_DIR RANDOM
+   NWS_HGT    WIND     10.0
+   OUTPUT     {out_sfc}
+   PROFILE    {out_pfl}
+"""
+
+SECTOR_TEMPLATE = ("   FREQ_SECT   ANNUAL {idx}\n"
+                   "   SECTOR      {idx} {start} {end}\n"
+                   "   SITE_CHAR   1 {idx} {albedo:.2f} {bowen:.2f} {roughness:.2f}")
 
 class AermetRunner:
     def __init__(self, config):
@@ -48,134 +93,152 @@ class AermetRunner:
         self.exe_path = Path(config['paths']['aermet_exe']).resolve()
         if platform.system() == "Windows" and self.exe_path.suffix.lower() != '.exe':
             self.exe_path = self.exe_path.with_suffix('.exe')
+
+        # Station location as written to AERMET.inp (constant for the run)
+        lat = config['location']['latitude']
+        lon = config['location']['longitude']
+        lat_char = 'N' if lat >= 0 else 'S'
+        lon_char = 'E' if lon >= 0 else 'W'
+        self.lat_lon_str = f"{abs(lat):.3f}{lat_char} {abs(lon):.3f}{lon_char}"
+        self.elev = config['location'].get('elevation', 0)
+
+        # Template fields that do not change between calls
+        self.inp_fields = {
+            'ua_id': self.params['ua_id'],
+            'surf_id': self.params['surf_id'],
+            'lat_lon_str': self.lat_lon_str,
+            'elev': self.elev,
+            'start_date': f"{self.year}/01/01",
+            'end_date': f"{self.year}/12/31",
+            'out_sfc': f"AM_{self.year}.SFC",
+            'out_pfl': f"AM_{self.year}.PFL",
+        }
+        self.onsite_name = f"onsite_{self.year}.dat"
+        # Copy of the aermet.inp behind the current processed outputs (written on success)
+        self.inp_stamp = self.proc_dir / f"AM_{self.year}.aermet.inp"
+
     def _prepare_onsite_data(self, csv_path):
+        # Imported here so up-to-date years never load pandas/numpy
+        import numpy as np
+        import pandas as pd
+
         print(f"    -> Formatting Onsite Data in logs folder...")
-        df = pd.read_csv(csv_path)
-        out_name = f"onsite_{self.year}.dat"
+        # Only parse the columns AERMET reads, with known dtypes (no type inference)
+        df = pd.read_csv(csv_path, usecols=lambda c: c in ONSITE_DTYPES,
+                         dtype=ONSITE_DTYPES, engine='c')
+        out_name = self.onsite_name
         out_path = self.run_dir / out_name
         
-        with open(out_path, 'w') as f:
-            for _, row in df.iterrows():
-                try:
-                    line = (f"{int(row['Year']):4d} {int(row['Month']):2d} {int(row['Day']):2d} {int(row['Hour']):2d} "
-                            f"{float(row['Temp_C']):6.1f} {float(row['DewPt_C']):6.1f} "
-                            f"{float(row['Press_mb']):7.1f} {float(row['Precip_mm']):6.2f} "
-                            f"{float(row['WindSpd_ms']):6.2f} {float(row['WindDir_deg']):6.1f} "
-                            f"{int(row['CloudCover']):2d}\n")
-                    f.write(line)
-                except KeyError as e:
-                    print(f"[CRITICAL ERROR] CSV missing column: {e}")
-                    raise e
+        missing = [c for c in ONSITE_COLUMNS if c not in df.columns]
+        if missing:
+            print(f"[CRITICAL ERROR] CSV missing column: {missing[0]!r}")
+            raise KeyError(missing[0])
+
+        # Format all rows in one pass into memory, then write the file in one go
+        data = df[ONSITE_COLUMNS].to_numpy(dtype=float)
+        buf = io.BytesIO()
+        np.savetxt(buf, data, fmt=ONSITE_FMT, newline="\n")
+        out_path.write_bytes(buf.getvalue())
         return out_name
 
-    def _write_input_file(self, ua_filename, onsite_filename):
-        print(f"    -> Creating AERMET.inp...")
-        lat = self.cfg['location']['latitude']
-        lon = self.cfg['location']['longitude']
-        lat_char = 'N' if lat >= 0 else 'S'
-        lon_char = 'E' if lon >= 0 else 'W'
-        lat_lon_str = f"{abs(lat):.3f}{lat_char} {abs(lon):.3f}{lon_char}"
-        elev = self.cfg['location'].get('elevation', 0)
-        
-        start_date = f"{self.year}/01/01"
-        end_date = f"{self.year}/12/31"
-        
-        # Output filenames
-        out_sfc = f"AM_{self.year}.SFC"
-        out_pfl = f"AM_{self.year}.PFL"
-        
-        inp_content = [
-            "JOB",
-            "   REPORT     aermet.rpt",
-            "   MESSAGES   aermet.msg",
-            "",
-            "UPPERAIR",
-            f"   DATA       {ua_filename} IGRA",
-            "   EXTRACT    ua_extract.dat",
-            f"   XDATES     {start_date} TO {end_date}",
-            f"   LOCATION   {self.params['ua_id']} {lat_lon_str} -2 {elev}",
-            "   QAOUT      ua_qa.out",
-            "",
-            "ONSITE",
-            "   OSHEIGHTS  2.0 10.0",
-            f"   DATA       {onsite_filename}",
-            f"   LOCATION   {self.params['surf_id']} {lat_lon_str} -2 {elev}",
-            f"   XDATES     {start_date} TO {end_date}",
-            "   QAOUT      onsite_qa.out",
-            "   THRESHOLD  0.5",
-            "   READ  1  OSYR OSMO OSDY OSHR TT01 DP01 PRES PRCP WS02 WD02 TSKC",
-            "   FORMAT    1  FREE",
-            "",
-            "METPREP",
-            f"   XDATES     {start_date} TO {end_date}",
-            "   METHOD     WIND_DIR RANDOM",
-            "   NWS_HGT    WIND     10.0",
-            f"   OUTPUT     {out_sfc}",
-            f"   PROFILE    {out_pfl}",
-            ""
-        ]
+    def _render_input(self, ua_filename, onsite_filename):
+        """AERMET.inp contents for this year's config (station, location, sectors)."""
+        fields = dict(self.inp_fields, ua_filename=ua_filename, onsite_filename=onsite_filename)
+        inp_content = AERMET_INP_TEMPLATE.format_map(fields)
 
         if 'sectors' in self.params:
-            for i, sector in enumerate(self.params['sectors']):
-                idx = int(i + 1)
-                inp_content.append(f"   FREQ_SECT   ANNUAL {idx}")
-                inp_content.append(f"   SECTOR      {idx} {int(sector['start'])} {int(sector['end'])}")
-                inp_content.append(f"   SITE_CHAR   1 {idx} {float(sector['albedo']):.2f} {float(sector['bowen']):.2f} {float(sector['roughness']):.2f}")
+            inp_content += "\n" + "\n".join(
+                SECTOR_TEMPLATE.format(
+                    idx=i + 1, start=int(sector['start']), end=int(sector['end']),
+                    albedo=float(sector['albedo']), bowen=float(sector['bowen']),
+                    roughness=float(sector['roughness'])
+                )
+                for i, sector in enumerate(self.params['sectors'])
+            )
+        return inp_content
 
+    def _write_input_file(self, inp_content):
+        print(f"    -> Creating AERMET.inp...")
         with open(self.run_dir / "aermet.inp", "w") as f:
-            f.write("\n".join(inp_content))
+            f.write(inp_content)
             
         return "aermet.inp"
 
+    def _outputs_up_to_date(self, inp_content, *inputs):
+        """
+        True if both processed outputs exist, are newer than every input, and were
+        produced from an identical aermet.inp (so config edits force a re-run).
+        """
+        outputs = [self.proc_dir / f"AM_{self.year}.SFC", self.proc_dir / f"AM_{self.year}.PFL"]
+        if not all(p.exists() for p in outputs + list(inputs)):
+            return False
+        if min(p.stat().st_mtime for p in outputs) <= max(p.stat().st_mtime for p in inputs):
+            return False
+        try:
+            return self.inp_stamp.read_bytes() == inp_content.encode()
+        except OSError:
+            return False
+
+    def _validate_inputs(self, src_ua, src_sfc):
+        """Returns (label, path) for each required file that does not exist."""
+        required = [
+            ("Missing Interim file", src_ua),
+            ("Missing Interim file", src_sfc),
+            ("Binary not found", self.exe_path),
+        ]
+        return [(label, path) for label, path in required if not path.exists()]
+
     def run(self):
         print(f"\n[PHASE 3] Running AERMET for {self.year}...")
         
-        # 1. Stage IGRA (Copy from Interim -> Logs/Sandbox)
         src_ua = self.interim_dir / f"upper_air_{self.year}.igra"
-        dst_ua = self.run_dir / "upper_air.igra"
-        
-        if src_ua.exists():
-            shutil.copy(src_ua, dst_ua)
-        else:
-            print(f"[ERROR] Missing Interim file: {src_ua}")
+        src_sfc = self.interim_dir / f"surface_data_{self.year}.csv"
+
+        # 0. Skip if already processed with the same inputs and settings (use --overwrite to force a re-run)
+        inp_content = self._render_input("upper_air.igra", self.onsite_name)
+        if not self.cfg.get('overwrite', False) and self._outputs_up_to_date(inp_content, src_ua, src_sfc):
+            print(f"    [SKIP] AERMET outputs up to date for {self.year}")
             return
 
-        # 2. Stage Onsite (CSV -> Logs/Sandbox DAT)
-        src_sfc = self.interim_dir / f"surface_data_{self.year}.csv"
-        if not src_sfc.exists():
-            print(f"[ERROR] Missing Interim file: {src_sfc}")
+        # 1. Pre-flight: report every missing input before doing any work
+        missing = self._validate_inputs(src_ua, src_sfc)
+        if missing:
+            for label, path in missing:
+                print(f"[ERROR] {label}: {path}")
             return
-            
+
+        # 2. Stage IGRA (Hardlink from Interim -> Logs/Sandbox)
+        link_or_copy(src_ua, self.run_dir / "upper_air.igra")
+
+        # 3. Stage Onsite (CSV -> Logs/Sandbox DAT)
         onsite_name = self._prepare_onsite_data(src_sfc)
 
-        # 3. Create INP
-        inp_name = self._write_input_file("upper_air.igra", onsite_name)
-        
-        # 4. Find Binary (Using the path we prepared in __init__)
-        if not self.exe_path.exists():
-            print(f"[ERROR] Binary not found: {self.exe_path}")
-            return
+        # 4. Create INP
+        inp_name = self._write_input_file(inp_content)
 
         # 5. Execute
         try:
             print(f"    -> Executing AERMET in {self.run_dir.name}...")
-            result = subprocess.run([str(self.exe_path), inp_name], 
-                                    cwd=self.run_dir, 
-                                    capture_output=True, text=True)
+            log_path = self.run_dir / "aermet.log"
+            # Binary, unbuffered: AERMET writes the bytes itself, Python never touches them
+            with open(log_path, "wb", buffering=0) as log_file:
+                subprocess.run([str(self.exe_path), inp_name], 
+                               cwd=self.run_dir, 
+                               stdout=log_file,
+                               stderr=subprocess.STDOUT)
             
             # 6. RESULT MANAGEMENT
             out_sfc = f"AM_{self.year}.SFC"
             out_pfl = f"AM_{self.year}.PFL"
             
             if (self.run_dir / out_sfc).exists():
-                # A. Move Results to Processed
-                shutil.copy(self.run_dir / out_sfc, self.proc_dir / out_sfc)
-                shutil.copy(self.run_dir / out_pfl, self.proc_dir / out_pfl)
+                # A. Move Results to Processed (a rename on the same filesystem)
+                replace_file(self.run_dir / out_sfc, self.proc_dir / out_sfc)
+                replace_file(self.run_dir / out_pfl, self.proc_dir / out_pfl)
+                self.inp_stamp.write_bytes(inp_content.encode())
                 print(f"    -> Success! {out_sfc} & {out_pfl} saved to {self.proc_dir}")
                 
                 # B. CLEANUP
-                os.remove(self.run_dir / out_sfc)
-                os.remove(self.run_dir / out_pfl)
                 if (self.run_dir / "upper_air.igra").exists():
                     os.remove(self.run_dir / "upper_air.igra")
                 if (self.run_dir / onsite_name).exists():
@@ -185,8 +248,10 @@ class AermetRunner:
 
             else:
                 print("[ERROR] AERMET finished but no .SFC file created.")
-                print("Check 'aermet.rpt' in the logs folder.")
-                print("STDOUT Snippet:", result.stdout[:200])
+                print("Check 'aermet.rpt' and 'aermet.log' in the logs folder.")
+                with open(log_path, 'rb') as log_file:
+                    log_file.seek(max(0, log_path.stat().st_size - 512))
+                    print("STDOUT Snippet:", log_file.read().decode(errors='replace'))
 
         except Exception as e:
             print(f"[ERROR] Run failed: {e}")
@@ -16,13 +16,44 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import subprocess
-import shutil
 import os
 import math
 import platform  # <-- Added platform import
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from functools import cached_property
 from pathlib import Path
 from src.inventory_manager import InventoryManager
 from src.geotiff_exporter import GeotiffExporter
+from src.file_utils import link_or_copy, replace_file
+
+# Meteorology pathway; identical for every pollutant of a year
+ME_BLOCK_TEMPLATE = (
+    "ME STARTING",
+    "   SURFFILE  AM_{year}.SFC",
+    "   PROFFILE  AM_{year}.PFL",
+    "   SURFDATA  99999 {year}",
+    "   UAIRDATA  99999 {year}",
+    "   SITEDATA  99999 {year}",
+    "   PROFBASE  {prof_elev:.1f} METERS",
+    "ME FINISHED",
+)
+
+# Runner and exporter of a pollutant worker process, built once by _init_pollutant_worker
+_worker = None
+
+def _init_pollutant_worker(config):
+    global _worker
+    _worker = (AermodRunner(config), GeotiffExporter(config))
+
+def _run_pollutant_task(pollutant, avg_times, prepared, export_budget):
+    """
+    Runs a single pollutant in a worker process. Module-level so it can be pickled.
+    prepared is the sandbox staged by the parent (see _prepare_pollutant), so the worker
+    never loads the inventory. export_budget is this worker's share of max_workers.
+    """
+    runner, tif_exporter = _worker
+    plt_files = runner._run_pollutant(pollutant, avg_times, prepared)
+    runner._export_geotiffs(tif_exporter, plt_files, export_budget)
 
 class AermodRunner:
     def __init__(self, config):
@@ -38,15 +69,42 @@ class AermodRunner:
         
         self.run_dir = self.project_root / "data" / "model" / "run" / self.project_name / str(self.year)
         self.run_dir.mkdir(parents=True, exist_ok=True)
+
+        self.src_sfc = self.met_dir / f"AM_{self.year}.SFC"
+        self.src_pfl = self.met_dir / f"AM_{self.year}.PFL"
         
         self.exe_path = Path(config['paths']['aermod_exe']).resolve()
         
         # --- NEW: Append .exe on Windows if missing ---
         if platform.system() == "Windows" and self.exe_path.suffix.lower() != '.exe':
             self.exe_path = self.exe_path.with_suffix('.exe')
+        self.exe_cmd = os.fsdecode(self.exe_path)
             
         self.params = config['aermod_params']
 
+        # Control/meteorology settings that do not depend on the pollutant
+        self.disp_env = self.params.get('dispersion_env', 'RURAL')
+        self.nox_method = self.params.get('nox_method', 'NONE')
+        co_tail = ["   URBANOPT  1000000"] if self.disp_env == "URBAN" else []
+        self.co_tail = tuple(co_tail + ["   ERRORFIL  aermod.err", "CO FINISHED"])
+
+        prof_elev = float(config['location'].get('elevation', 0.0))
+        self.me_block = tuple(line.format(year=self.year, prof_elev=prof_elev) for line in ME_BLOCK_TEMPLATE)
+
+    @cached_property
+    def inv_man(self):
+        """
+        One inventory manager per run: CSVs and WKT geometries are parsed once and
+        reused for every pollutant. Built on first use, so pollutant worker processes
+        (which only run pre-staged sandboxes) never load the inventory.
+        """
+        return InventoryManager(self.cfg)
+
+    @cached_property
+    def re_block(self):
+        """Receptor pathway; depends only on the project grid, so it is built once per run."""
+        return tuple(self._generate_receptors())
+
     def _generate_receptors(self):
         print("    -> Generating Receptor Grid...")
         grid = self.params.get('receptor_grid', {'range_m': 5000, 'spacing_m': 500})
@@ -66,21 +124,17 @@ class AermodRunner:
             "RE FINISHED"
         ]
 
-    def _write_input_file(self, pollutant, avg_times):
+    def _write_input_file(self, pollutant, avg_times, run_dir):
         print(f"    -> Generating AERMOD.INP for {pollutant}...")
         
         avg_str = " ".join(avg_times)
         
-        # Retrieve Control Pathway params
-        disp_env = self.params.get('dispersion_env', 'RURAL')
-        nox_method = self.params.get('nox_method', 'NONE')
-        
         # Build MODELOPT dynamically
         modelopt_opts = ["CONC", "FLAT"]
         
         # Only append NOx method if the pollutant is NO2 and it's not NONE
-        if pollutant == "NO2" and nox_method != "NONE":
-            modelopt_opts.append(nox_method)
+        if pollutant == "NO2" and self.nox_method != "NONE":
+            modelopt_opts.append(self.nox_method)
             
         modelopt_str = " ".join(modelopt_opts)
         
@@ -91,50 +145,10 @@ class AermodRunner:
             f"   AVERTIME  {avg_str}", 
             f"   POLLUTID  {pollutant}",
             "   RUNORNOT  RUN",
+            *self.co_tail,
         ]
-        
-        if disp_env == "URBAN":
-            co_block.append("   URBANOPT  1000000") 
-            
-        co_block.append("   ERRORFIL  aermod.err")
-        co_block.append("CO FINISHED")
-
-        inv_man = InventoryManager(self.cfg)
-        so_block = inv_man.generate_all_sources(pollutant)
-        
-        # FIX: URBANSRC must be inserted BEFORE the SRCGROUP keyword
-        if disp_env == "URBAN":
-            insert_idx = -1
-            # Find the line index where SRCGROUP is first declared
-            for i, line in enumerate(so_block):
-                if "SRCGROUP" in line:
-                    insert_idx = i
-                    break
-            
-            # Insert URBANSRC right before SRCGROUP, otherwise put it at the end
-            if insert_idx != -1:
-                so_block.insert(insert_idx, "   URBANSRC  ALL")
-            elif so_block and "SO FINISHED" in so_block[-1]:
-                so_block.insert(-1, "   URBANSRC  ALL")
-            else:
-                so_block.append("   URBANSRC  ALL")
 
-        re_block = self._generate_receptors()
-
-        sfc_file = f"AM_{self.year}.SFC"
-        pfl_file = f"AM_{self.year}.PFL"
-        prof_elev = float(self.cfg['location'].get('elevation', 0.0))
-        
-        me_block = [
-            "ME STARTING",
-            f"   SURFFILE  {sfc_file}",
-            f"   PROFFILE  {pfl_file}",
-            f"   SURFDATA  99999 {self.year}",
-            f"   UAIRDATA  99999 {self.year}",
-            f"   SITEDATA  99999 {self.year}",
-            f"   PROFBASE  {prof_elev:.1f} METERS", 
-            "ME FINISHED"
-        ]
+        so_block = self.inv_man.generate_all_sources(pollutant, urban=(self.disp_env == "URBAN"))
 
         ou_block = ["OU STARTING", "   RECTABLE ALLAVE FIRST-SECOND"]
         for avg in avg_times:
@@ -144,25 +158,117 @@ class AermodRunner:
             ou_block.append(f"   PLOTFILE {aer_key} ALL 1ST {fname}")
         ou_block.append("OU FINISHED")
         
-        full_inp = "\n".join(co_block + [""] + so_block + [""] + re_block + [""] + me_block + [""] + ou_block)
-        inp_path = self.run_dir / "aermod.inp"
+        # Write block by block (blank line between pathways) instead of
+        # concatenating every block into one list and string first
+        inp_path = run_dir / "aermod.inp"
         
-        with open(inp_path, "w") as f:
-            f.write(full_inp)
+        # newline="\n" skips per-write newline translation; AERMOD reads LF files on every platform
+        with open(inp_path, "w", buffering=1 << 20, newline="\n") as f:
+            for i, block in enumerate((co_block, so_block, self.re_block, self.me_block, ou_block)):
+                if i: f.write("\n\n")
+                f.write("\n".join(block))
         
         return "aermod.inp"
 
+    def _report_export(self, result):
+        success, msg = result
+        if success:
+            print(f"       + {msg}")
+        else:
+            print(f"       - {msg}")
+
+    def _worker_budget(self):
+        return self.cfg.get('max_workers') or os.cpu_count() or 1
+
+    def _export_workers(self, n_files, budget=None):
+        return max(1, min(n_files, budget or self._worker_budget()))
+
+    def _export_geotiffs(self, tif_exporter, plt_files, budget):
+        """
+        Rasterizes PLT files on a thread pool; the GDAL/SciPy work releases the GIL.
+        budget is the number of workers this call may use: the whole max_workers on the
+        sequential path, a pollutant worker's share of it otherwise. With a budget of
+        one the files are exported inline.
+        """
+        if not plt_files: return
+        print(f"    -> Rendering {len(plt_files)} GeoTIFFs...")
+        n_threads = self._export_workers(len(plt_files), budget)
+        if n_threads == 1:
+            for plt_path in plt_files:
+                self._report_export(tif_exporter.export(plt_path))
+            return
+        with ThreadPoolExecutor(max_workers=n_threads) as ex:
+            for result in ex.map(tif_exporter.export, plt_files):
+                self._report_export(result)
+
+    def _prepare_pollutant(self, pol, avg_times):
+        """Stages the sandbox (run_dir/{pol}) and writes its aermod.inp. Returns (pol_dir, inp_name)."""
+        # Each pollutant gets its own working directory so concurrent runs
+        # never share aermod.inp / aermod.out / PLT files
+        pol_dir = self.run_dir / pol
+        pol_dir.mkdir(parents=True, exist_ok=True)
+        for met_file in (self.src_sfc, self.src_pfl):
+            link_or_copy(met_file, pol_dir / met_file.name)
+
+        return pol_dir, self._write_input_file(pol, avg_times, pol_dir)
+
+    def _run_pollutant(self, pol, avg_times, prepared=None):
+        """
+        Runs AERMOD for one pollutant in its own sandbox (run_dir/{pol}).
+        prepared is the result of _prepare_pollutant, if it was already staged.
+        Returns the PLT files moved to the output folder, ready for GeoTIFF export.
+        """
+        print(f"\n   >>> MODELING POLLUTANT: {pol} <<<")
+
+        pol_dir, inp_name = prepared or self._prepare_pollutant(pol, avg_times)
+        plt_files = []
+
+        try:
+            print(f"    -> Executing AERMOD in sandbox...")
+            log_name = f"aermod_{pol}.log"
+            # AERMOD writes straight to the log fd; no Python file object needed
+            log_fd = os.open(pol_dir / log_name, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                # Our fds are non-inheritable (PEP 446), so skip the close-all-fds pass
+                subprocess.run([self.exe_cmd, inp_name], 
+                               cwd=pol_dir,
+                               stdout=log_fd,
+                               stderr=subprocess.STDOUT,
+                               close_fds=False)
+            finally:
+                os.close(log_fd)
+            
+            out_file = pol_dir / "aermod.out"
+            if out_file.exists():
+                final_out = self.output_dir / f"AERMOD_{self.year}_{pol}.out"
+                replace_file(out_file, final_out)
+                print(f"    -> Output saved: {final_out.name}")
+
+                with os.scandir(pol_dir) as entries:
+                    plts = [e for e in entries if e.name.endswith(".PLT") and e.is_file()]
+                for entry in plts:
+                    dest = self.output_dir / entry.name
+                    replace_file(entry.path, dest)
+                    plt_files.append(dest)
+                
+                if plt_files:
+                    print(f"    -> Success! {len(plt_files)} Plot files moved.")
+                else:
+                    print("[WARNING] No .PLT files found.")
+            else:
+                print(f"[CRITICAL] AERMOD failed for {pol}. Check {pol}/{log_name}")
+
+        except Exception as e:
+            print(f"[ERROR] Execution failed for {pol}: {e}")
+
+        return plt_files
+
     def run(self):
         print(f"\n[PHASE 4] Running AERMOD Model for {self.year}...")
         
-        src_sfc = self.met_dir / f"AM_{self.year}.SFC"
-        src_pfl = self.met_dir / f"AM_{self.year}.PFL"
-        if not src_sfc.exists() or not src_pfl.exists():
+        if not self.src_sfc.exists() or not self.src_pfl.exists():
             print(f"[ERROR] Met data missing for {self.year} in {self.met_dir}")
             return
-            
-        shutil.copy(src_sfc, self.run_dir / src_sfc.name)
-        shutil.copy(src_pfl, self.run_dir / src_pfl.name)
 
         if not self.exe_path.exists():
              print(f"[ERROR] AERMOD Executable not found at {self.exe_path}")
@@ -176,52 +282,52 @@ class AermodRunner:
             active_pollutants = ['SO2']
             pollutants_config = {'SO2': {'avg_times': ['1', '24']}}
 
-        # Initialize Exporter for automatic GeoTIFF generation
-        tif_exporter = GeotiffExporter(self.cfg)
-
+        jobs = []
         for pol in active_pollutants:
-            print(f"\n   >>> MODELING POLLUTANT: {pol} <<<")
             settings = pollutants_config.get(pol, {'avg_times': ['1', '24']})
-            avg_times = settings.get('avg_times', ['1', '24'])
-
-            inp_name = self._write_input_file(pol, avg_times)
+            jobs.append((pol, settings.get('avg_times', ['1', '24'])))
 
-            try:
-                print(f"    -> Executing AERMOD in sandbox...")
-                log_name = f"aermod_{pol}.log"
-                with open(self.run_dir / log_name, "w") as log_file:
-                    subprocess.run([str(self.exe_path), inp_name], 
-                                   cwd=self.run_dir,
-                                   stdout=log_file,
-                                   stderr=subprocess.STDOUT)
-                
-                out_file = self.run_dir / "aermod.out"
-                if out_file.exists():
-                    final_out = self.output_dir / f"AERMOD_{self.year}_{pol}.out"
-                    shutil.move(out_file, final_out)
-                    print(f"    -> Output saved: {final_out.name}")
-
-                    count = 0
-                    for plt in self.run_dir.glob("*.PLT"):
-                        dest = self.output_dir / plt.name
-                        if dest.exists(): os.remove(dest)
-                        shutil.move(plt, dest)
-                        count += 1
-                        
-                        # --- NEW: AUTO-EXPORT TO TIF ---
-                        print(f"    -> Rendering GeoTIFF...")
-                        success, msg = tif_exporter.export(dest)
-                        if success:
-                            print(f"       + {msg}")
-                        else:
-                            print(f"       - {msg}")
-                    
-                    if count > 0:
-                        print(f"    -> Success! {count} Plot files moved & rasterized.")
-                    else:
-                        print("[WARNING] No .PLT files found.")
-                else:
-                    print(f"[CRITICAL] AERMOD failed for {pol}. Check {log_name}")
+        # Pollutants are independent AERMOD runs; spread them over worker processes
+        budget = self._worker_budget()
+        workers = min(len(jobs), budget)
+        if workers > 1:
+            print(f"    -> Running {len(jobs)} pollutants across {workers} worker processes...")
+            # Each worker exports its own PLTs, so it only gets its share of the budget
+            export_budget = max(1, budget // workers)
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_pollutant_worker,
+                                     initargs=(self.cfg,)) as ex:
+                futures = {}
+                for pol, avg_times in jobs:
+                    # Staged here so the inventory and receptor grid are built once for all
+                    # pollutants; each job is submitted as soon as its sandbox is ready
+                    try:
+                        prepared = self._prepare_pollutant(pol, avg_times)
+                    except Exception as e:
+                        print(f"[ERROR] Execution failed for {pol}: {e}")
+                        continue
+                    futures[ex.submit(_run_pollutant_task, pol, avg_times, prepared, export_budget)] = pol
+                for fut in as_completed(futures):
+                    try:
+                        fut.result()
+                    except Exception as e:
+                        print(f"[ERROR] Execution failed for {futures[fut]}: {e}")
+        else:
+            # Initialize Exporter for automatic GeoTIFF generation
+            tif_exporter = GeotiffExporter(self.cfg)
 
-            except Exception as e:
-                print(f"[ERROR] Execution failed for {pol}: {e}")
+            # AERMOD takes one pollutant per run, so runs cannot be merged; instead the
+            # next sandbox and aermod.inp are prepared while the current run executes
+            with ThreadPoolExecutor(max_workers=1) as prep_pool:
+                next_prep = prep_pool.submit(self._prepare_pollutant, *jobs[0])
+                for i, (pol, avg_times) in enumerate(jobs):
+                    current_prep = next_prep
+                    if i + 1 < len(jobs):
+                        next_prep = prep_pool.submit(self._prepare_pollutant, *jobs[i + 1])
+                    # A staging failure only skips this pollutant, as on the parallel path
+                    try:
+                        prepared = current_prep.result()
+                    except Exception as e:
+                        print(f"[ERROR] Execution failed for {pol}: {e}")
+                        continue
+                    plt_files = self._run_pollutant(pol, avg_times, prepared)
+                    self._export_geotiffs(tif_exporter, plt_files, budget)
@@ -15,19 +15,39 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import copy
+import os
 import yaml
 import sys
+from functools import lru_cache
 from pathlib import Path
 
+# libyaml's C parser when PyYAML was built with it; pure-Python otherwise
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# Config sections holding paths: None = every key, otherwise only the listed keys
+PATH_KEYS = {
+    'paths': None,
+    'inventory': None,
+    'project': frozenset({'user_sfc', 'user_pfl'}),
+}
+
+# Root is two levels up from this script (src/config_loader.py -> src -> Root)
+PROJECT_ROOT = Path(__file__).parent.parent.resolve()
+
 def load_config(config_name="default.yaml"):
     """
     Loads YAML configuration. 
     1. Searches in 'project_configs/' first.
     2. Anchors all paths relative to the Project Root (ATAQ_AERMOD/).
+    Parsed configs are cached per file and modification time; each call
+    returns its own copy, so callers may mutate the result freely.
     """
     # Define Anchors
-    # Root is two levels up from this script (src/config_loader.py -> src -> Root)
-    project_root = Path(__file__).parent.parent.resolve()
+    project_root = PROJECT_ROOT
     config_dir = project_root / "project_configs"
     
     # Check if user passed a full path or just a filename
@@ -45,10 +65,18 @@ def load_config(config_name="default.yaml"):
         print(f"        Searched in: {config_dir}")
         sys.exit(1)
 
+    target_path = target_path.resolve()
+    return copy.deepcopy(_parse_config(target_path, target_path.stat().st_mtime_ns))
+
+@lru_cache(maxsize=8)
+def _parse_config(target_path, mtime_ns):
+    """Parses and path-normalizes one config file. mtime_ns only keys the cache."""
+    project_root = PROJECT_ROOT
+
     # Load YAML
     try:
-        with open(target_path, 'r') as f:
-            config = yaml.safe_load(f)
+        # One read, then libyaml scans the whole buffer and decodes the UTF-8 itself
+        config = yaml.load(target_path.read_bytes(), Loader=_YamlLoader)
     except yaml.YAMLError as e:
         print(f"[ERROR] Invalid YAML format: {e}")
         sys.exit(1)
@@ -56,25 +84,21 @@ def load_config(config_name="default.yaml"):
     # --- PATH NORMALIZATION ---
     # This ensures that "data/met/raw" in the yaml becomes "/home/user/.../data/met/raw"
     
+    # Pure string ops: project_root is already resolved, so joining and
+    # normalizing lexically avoids a stat/readlink per path component
+    root = str(project_root)
     def resolve_path(p_str):
         if not p_str: return ""
-        p = Path(p_str)
-        if p.is_absolute(): return p
-        return (project_root / p).resolve()
-
-    if 'paths' in config:
-        for key, val in config['paths'].items():
-            config['paths'][key] = resolve_path(val)
-
-    if 'inventory' in config:
-        for key, val in config['inventory'].items():
-            config['inventory'][key] = resolve_path(val)
+        p_str = os.fspath(p_str)
+        if os.path.isabs(p_str): return Path(p_str)
+        return Path(os.path.normpath(os.path.join(root, p_str)))
 
-    # Handle User Met Files
-    if 'project' in config:
-        if config['project'].get('user_sfc'):
-            config['project']['user_sfc'] = resolve_path(config['project']['user_sfc'])
-        if config['project'].get('user_pfl'):
-            config['project']['user_pfl'] = resolve_path(config['project']['user_pfl'])
+    for section, keys in PATH_KEYS.items():
+        block = config.get(section)
+        if not block: continue
+        for key in (block.keys() if keys is None else keys & block.keys()):
+            # User met files are only resolved when set
+            if keys is not None and not block[key]: continue
+            block[key] = resolve_path(block[key])
 
     return config
@@ -0,0 +1,55 @@
+"""
+ATAQ AERMOD
+Copyright (C) 2026 ATAQ
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import errno
+import os
+import shutil
+from pathlib import Path
+
+def link_or_copy(src, dst):
+    """
+    Stages src at dst as a hardlink (no data copied).
+    Across drives, where hardlinks are impossible, a symlink is used instead;
+    a regular copy is the last resort (e.g. Windows without symlink rights).
+    Only use this for files the consumer reads but never modifies.
+    """
+    src, dst = Path(src), Path(dst)
+    if dst.exists() or dst.is_symlink():
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+        return
+    except OSError as e:
+        if e.errno == errno.EXDEV:
+            try:
+                os.symlink(src.resolve(), dst)
+                return
+            except OSError:
+                pass
+    # copyfile uses the OS fast paths (sendfile / CopyFile2) where available
+    shutil.copyfile(src, dst)
+
+def replace_file(src, dst):
+    """
+    Moves src to dst, overwriting dst if it exists.
+    A single atomic rename on the same filesystem; falls back to
+    shutil.move (copy + delete) when src and dst are on different drives.
+    """
+    try:
+        os.replace(src, dst)
+    except OSError:
+        shutil.move(src, dst)
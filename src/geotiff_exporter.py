@@ -1,12 +1,48 @@
-import pandas as pd
+import hashlib
+import io
+import os
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
 from scipy.interpolate import griddata
 import pyproj
 import rasterio
+from rasterio.io import MemoryFile
 from rasterio.transform import from_bounds
 
+@lru_cache(maxsize=32)
+def _utm_projection(lat, lon):
+    """
+    Builds the UTM CRS for the site and projects the site centre into it.
+    Cached: PROJ initialisation is the expensive part and only depends on lat/lon.
+    """
+    zone = int((lon + 180) / 6) + 1
+    south = lat < 0
+    
+    wgs84 = pyproj.CRS("EPSG:4326")
+    utm_str = f"+proj=utm +zone={zone} {'+south' if south else ''} +ellps=WGS84 +datum=WGS84 +units=m +no_defs"
+    utm_crs = pyproj.CRS.from_string(utm_str)
+    
+    transformer = pyproj.Transformer.from_crs(wgs84, utm_crs, always_xy=True)
+    center_x, center_y = transformer.transform(lon, lat)
+    return wgs84, utm_crs, transformer, center_x, center_y
+
+def _axis_weights(axis, samples):
+    """Left-neighbour indices and linear weights of samples on a sorted axis."""
+    idx = np.clip(np.searchsorted(axis, samples) - 1, 0, len(axis) - 2)
+    weights = (samples - axis[idx]) / (axis[idx + 1] - axis[idx])
+    return idx, weights
+
 class GeotiffExporter:
+    # GeoTIFF metadata tags: blake2b digest of the source PLT, and the georeferencing
+    # and format the raster was written with (a TIF is only reused if both match)
+    SOURCE_TAG = 'ATAQ_SOURCE_BLAKE2B'
+    SETTINGS_TAG = 'ATAQ_EXPORT_SETTINGS'
+
+    # Output raster: RESOLUTION x RESOLUTION float32 pixels, deflate + float predictor, 256px tiles
+    RESOLUTION = 500
+    FORMAT_KEY = "float32 deflate predictor=3 tiles=256"
+
     def __init__(self, config):
         self.config = config
         
@@ -14,69 +50,138 @@ class GeotiffExporter:
         lat = float(self.config['location'].get('latitude', 0.0))
         lon = float(self.config['location'].get('longitude', 0.0))
         
-        zone = int((lon + 180) / 6) + 1
-        south = lat < 0
-        
-        self.wgs84 = pyproj.CRS("EPSG:4326")
-        utm_str = f"+proj=utm +zone={zone} {'+south' if south else ''} +ellps=WGS84 +datum=WGS84 +units=m +no_defs"
-        self.utm_crs = pyproj.CRS.from_string(utm_str)
-        
-        self.transformer = pyproj.Transformer.from_crs(self.wgs84, self.utm_crs, always_xy=True)
-        self.center_x, self.center_y = self.transformer.transform(lon, lat)
+        (self.wgs84, self.utm_crs, self.transformer,
+         self.center_x, self.center_y) = _utm_projection(round(lat, 6), round(lon, 6))
+        self.settings_key = (f"{self.utm_crs.srs} centre={self.center_x:.3f},{self.center_y:.3f} "
+                             f"res={self.RESOLUTION} {self.FORMAT_KEY}")
+
+    def _existing_tags(self, out_path):
+        """Metadata tags of an existing TIF written with these settings; None otherwise."""
+        try:
+            with rasterio.open(out_path) as src:
+                tags = src.tags()
+        except Exception:
+            return None
+        return tags if tags.get(self.SETTINGS_TAG) == self.settings_key else None
 
-    def export(self, plt_path):
-        """Converts a PLT file into a GeoTIFF."""
+    def _interpolate(self, x, y, z, xi, yi):
+        """
+        Interpolates receptor values onto the (yi, xi) raster grid.
+        GRIDCART receptors form a full regular grid, which is interpolated
+        bilinearly in place; scattered receptors fall back to Delaunay (griddata).
+        """
+        ux, ix = np.unique(x, return_inverse=True)
+        uy, iy = np.unique(y, return_inverse=True)
+        if len(ux) > 1 and len(uy) > 1 and len(ux) * len(uy) == len(z):
+            grid = np.full((len(uy), len(ux)), np.nan)
+            grid[iy, ix] = z
+            if not np.isnan(grid).any():
+                # Bilinear is separable: interpolate along X, then along Y.
+                # No 500x500 coordinate meshgrid is ever built.
+                cx, wx = _axis_weights(ux, xi)
+                cy, wy = _axis_weights(uy, yi)
+                rows = grid[:, cx] * (1 - wx) + grid[:, cx + 1] * wx
+                return rows[cy] * (1 - wy)[:, None] + rows[cy + 1] * wy[:, None]
+
+        Xi, Yi = np.meshgrid(xi, yi)
+        return griddata((x, y), z, (Xi, Yi), method='linear')
+
+    def export(self, plt_path, overwrite=False):
+        """
+        Converts a PLT file into a GeoTIFF.
+        Skips the work if the TIF was written for this site and format and is either
+        newer than the PLT or built from identical PLT contents, unless overwrite
+        (or the config's 'overwrite' flag) is set.
+        """
         plt_path = Path(plt_path)
-        if not plt_path.exists():
+        try:
+            plt_mtime = plt_path.stat().st_mtime_ns
+        except OSError:
             return False, f"File not found: {plt_path.name}"
 
+        overwrite = overwrite or self.config.get('overwrite', False)
+        out_path = plt_path.with_suffix('.tif')
+        tags = None
+        if not overwrite:
+            try:
+                tif_mtime = out_path.stat().st_mtime_ns
+            except OSError:
+                tif_mtime = None
+            # Reading the tags is cheap next to hashing the PLT; a TIF georeferenced
+            # for another site or format is never reused
+            tags = self._existing_tags(out_path) if tif_mtime is not None else None
+            if tags is not None and tif_mtime >= plt_mtime:
+                return True, f"Up to date {out_path.name}"
+
         try:
-            # Read PLT file
-            df = pd.read_csv(plt_path, sep=r'\s+', comment='*', header=None)
-            df = df.iloc[:, :3]
-            df.columns = ['x', 'y', 'conc']
+            # Fingerprint the PLT; an existing TIF built from identical bytes is reused
+            raw = plt_path.read_bytes()
+            digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+            if tags is not None and tags.get(self.SOURCE_TAG) == digest:
+                return True, f"Up to date {out_path.name}"
+
+            # Read PLT file (NumPy's C reader; only X, Y and CONC are converted)
+            arr = np.loadtxt(io.BytesIO(raw), comments='*', usecols=(0, 1, 2),
+                             dtype=np.float64, ndmin=2)
+            if len(arr) < 3:
+                return False, f"Too few receptor rows in {plt_path.name} ({len(arr)})"
             
             # Convert relative grid coordinates to absolute UTM
-            x_abs = df['x'].values + self.center_x
-            y_abs = df['y'].values + self.center_y
-            z = df['conc'].values
+            x_abs = arr[:, 0] + self.center_x
+            y_abs = arr[:, 1] + self.center_y
+            z = arr[:, 2]
 
             # Define high-resolution raster grid (500x500 pixels)
-            res = 500 
+            res = self.RESOLUTION
+            # Raster rows run top-to-bottom, so sample Y from north to south;
+            # the interpolated array is then already in write order (no flip)
             xi = np.linspace(x_abs.min(), x_abs.max(), res)
-            yi = np.linspace(y_abs.min(), y_abs.max(), res)
-            Xi, Yi = np.meshgrid(xi, yi)
+            yi = np.linspace(y_abs.max(), y_abs.min(), res)
             
             # Interpolate
-            Zi = griddata((x_abs, y_abs), z, (Xi, Yi), method='linear')
+            Zi = self._interpolate(x_abs, y_abs, z, xi, yi)
             
-            # Replace NaNs (outside convex hull) with a NoData value
-            nodata_val = -9999.0
-            Zi = np.nan_to_num(Zi, nan=nodata_val)
+            # Single precision is ample for concentrations and halves the file size
+            Zi = Zi.astype(np.float32, copy=False)
 
-            # Raster arrays are written top-to-bottom. Meshgrid Y goes bottom-to-top.
-            # We must flip the array vertically.
-            Zi = np.flipud(Zi)
+            # Replace NaNs (outside convex hull) with a NoData value, in place
+            nodata_val = -9999.0
+            Zi[np.isnan(Zi)] = nodata_val
 
             # Calculate spatial transform
             minx, maxx = x_abs.min(), x_abs.max()
             miny, maxy = y_abs.min(), y_abs.max()
             transform = from_bounds(minx, miny, maxx, maxy, res, res)
             
-            # Write GeoTIFF
-            out_path = plt_path.with_suffix('.tif')
-            with rasterio.open(
-                out_path, 'w',
-                driver='GTiff',
-                height=Zi.shape[0],
-                width=Zi.shape[1],
-                count=1,
-                dtype=Zi.dtype,
-                crs=self.utm_crs,
-                transform=transform,
-                nodata=nodata_val
-            ) as dst:
-                dst.write(Zi, 1)
+            # Build the GeoTIFF in memory (GDAL seeks freely there), then write it out
+            # in one sequential write to a temp sibling that is renamed into place, so a
+            # truncated file never carries a fresh mtime under the final name
+            with MemoryFile() as mem:
+                with mem.open(
+                    driver='GTiff',
+                    height=Zi.shape[0],
+                    width=Zi.shape[1],
+                    count=1,
+                    dtype='float32',
+                    crs=self.utm_crs,
+                    transform=transform,
+                    nodata=nodata_val,
+                    # Floating-point predictor + deflate compresses smooth plume fields well
+                    compress='deflate',
+                    predictor=3,
+                    tiled=True,
+                    blockxsize=256,
+                    blockysize=256
+                ) as dst:
+                    dst.write(Zi, 1)
+                    dst.update_tags(**{self.SOURCE_TAG: digest, self.SETTINGS_TAG: self.settings_key})
+                tmp_path = out_path.with_name(out_path.name + ".tmp")
+                try:
+                    tmp_path.write_bytes(mem.read())
+                    os.replace(tmp_path, out_path)
+                except BaseException:
+                    tmp_path.unlink(missing_ok=True)
+                    raise
 
             return True, f"Exported {out_path.name}"
             
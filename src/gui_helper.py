@@ -17,66 +17,158 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog, scrolledtext
-import yaml
+from tkinter import ttk, messagebox, scrolledtext
 from pathlib import Path
 import platform
-import subprocess
 import os
+import re
 import threading
 import queue
 import sys
+import locale
+import copy
+import hashlib
+import io
+from collections import OrderedDict
+
+_YEAR_RE = re.compile(r'\d+')
+
+# PyYAML, subprocess and filedialog are imported on first use to keep GUI start-up light
+_yaml_api = None
+
+def _yaml():
+    """Returns (yaml, SafeLoader, SafeDumper), importing PyYAML on first call.
+    Prefers libyaml's C parser/emitter when PyYAML was built with it; pure-Python otherwise."""
+    global _yaml_api
+    if _yaml_api is None:
+        import yaml
+        try:
+            from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+        except ImportError:
+            from yaml import SafeLoader, SafeDumper
+        _yaml_api = (yaml, SafeLoader, SafeDumper)
+    return _yaml_api
+
+def _open_with(command):
+    def _open(path):
+        import subprocess
+        # Fire and forget: the Tk thread must not wait for the viewer/editor to exit
+        subprocess.Popen([command, path])
+    return _open
+
+# The OS cannot change at runtime, so pick the file opener once at import
+if platform.system() == "Windows": _open_file = os.startfile
+elif platform.system() == "Darwin": _open_file = _open_with("open")
+else: _open_file = _open_with("xdg-open")
+
+class _PlainVar:
+    """StringVar stand-in for fields whose tab is not built yet; no Tcl variable behind it."""
+    __slots__ = ('value',)
+
+    def __init__(self, value=''):
+        self.value = str(value)
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = str(value)
 
 class ToolTip(object):
-    """Creates a tooltip for a given widget"""
+    """Creates a tooltip for a given widget.
+    All tooltips share one class binding (bindtag "ToolTip") and one Toplevel;
+    the hovered widget's text is looked up by its path."""
+    wait_time = 500
+    _texts = {}           # widget path -> tooltip text
+    _bound_root = None    # root the class binding was registered on
+    _after_id = None      # pending show timer (only one tooltip can be pending)
+    _after_widget = None
+    _shared_tw = None
+    _shared_label = None
+
     def __init__(self, widget, text='widget info'):
-        self.wait_time = 500
-        self.wrap_length = 180
         self.widget = widget
         self.text = text
-        self.widget.bind("<Enter>", self.enter)
-        self.widget.bind("<Leave>", self.leave)
-        self.id = None
-        self.tw = None
-
-    def enter(self, event=None):
-        self.schedule()
-    def leave(self, event=None):
-        self.unschedule()
-        self.hidetip()
-    def schedule(self):
-        self.unschedule()
-        self.id = self.widget.after(self.wait_time, self.showtip)
-    def unschedule(self):
-        id = self.id
-        self.id = None
-        if id: self.widget.after_cancel(id)
-    def showtip(self, event=None):
+        ToolTip._texts[str(widget)] = text
+        root = widget._root()
+        if ToolTip._bound_root is not root:
+            widget.bind_class("ToolTip", "<Enter>", ToolTip._enter)
+            widget.bind_class("ToolTip", "<Leave>", ToolTip._leave)
+            ToolTip._bound_root = root
+        widget.bindtags(widget.bindtags() + ("ToolTip",))
+
+    @classmethod
+    def _enter(cls, event):
+        cls._unschedule()
+        cls._after_widget = event.widget
+        cls._after_id = event.widget.after(cls.wait_time, cls._showtip, event.widget)
+    @classmethod
+    def _leave(cls, event):
+        cls._unschedule()
+        cls._hidetip()
+    @classmethod
+    def _unschedule(cls):
+        id, widget = cls._after_id, cls._after_widget
+        cls._after_id = cls._after_widget = None
+        if id: widget.after_cancel(id)
+    @classmethod
+    def _showtip(cls, widget):
+        cls._after_id = cls._after_widget = None
+        text = cls._texts.get(str(widget))
+        if text is None or not widget.winfo_exists(): return
         x = y = 0
-        x, y, cx, cy = self.widget.bbox("insert")
-        x += self.widget.winfo_rootx() + 25
-        y += self.widget.winfo_rooty() + 20
-        self.tw = tk.Toplevel(self.widget)
-        self.tw.wm_overrideredirect(True)
-        self.tw.wm_geometry(f"+{x}+{y}")
-        label = tk.Label(self.tw, text=self.text, justify='left',
-                       background="#ffffe0", relief='solid', borderwidth=1,
-                       font=("tahoma", "8", "normal"))
-        label.pack(ipadx=1)
-    def hidetip(self):
-        tw = self.tw
-        self.tw= None
-        if tw: tw.destroy()
+        x, y, cx, cy = widget.bbox("insert")
+        x += widget.winfo_rootx() + 25
+        y += widget.winfo_rooty() + 20
+        # One tooltip window is shared by all tooltips; it is only re-labelled and moved
+        if cls._shared_tw is None or not cls._shared_tw.winfo_exists():
+            tw = tk.Toplevel(widget._root())
+            tw.wm_overrideredirect(True)
+            cls._shared_label = tk.Label(tw, justify='left',
+                           background="#ffffe0", relief='solid', borderwidth=1,
+                           font=("tahoma", "8", "normal"))
+            cls._shared_label.pack(ipadx=1)
+            cls._shared_tw = tw
+        cls._shared_label.config(text=text)
+        cls._shared_tw.wm_geometry(f"+{x}+{y}")
+        cls._shared_tw.deiconify()
+    @classmethod
+    def _hidetip(cls):
+        tw = cls._shared_tw
+        if tw is not None and tw.winfo_exists(): tw.withdraw()
 
 class GUIHelper:
+    pollutant_options = ("SO2", "NO2", "PM10", "PM2.5", "CO", "Pb", "OTHER")
+    avg_time_options = ("1", "3", "8", "24", "ANNUAL")
+    default_avg_times = frozenset({"1", "24"})
+    _open_native = staticmethod(_open_file)
+
+    # UI field -> (config section, key, converter), in the order keys are written to the YAML
+    config_fields = {
+        'project_name': ('project', 'name', str),
+        'station_name': ('project', 'station_name', str),
+        'years': ('project', 'years', lambda v: [int(y) for y in _YEAR_RE.findall(v)]),
+        'data_source': ('project', 'data_source', str),
+        'lat': ('location', 'latitude', float),
+        'lon': ('location', 'longitude', float),
+        'elev': ('location', 'elevation', float),
+        'aermet_exe': ('paths', 'aermet_exe', str),
+        'aermod_exe': ('paths', 'aermod_exe', str),
+        'inv_point': ('inventory', 'point', str),
+        'inv_area': ('inventory', 'area', str),
+        'inv_line': ('inventory', 'line', str),
+        'disp_env': ('aermod_params', 'dispersion_env', str),
+        'nox_method': ('aermod_params', 'nox_method', str),
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("ATAQ AERMOD Pipeline Controller")
         self.root.geometry("900x900")
         
         self.vars = {}
-        self.vars['disp_env'] = tk.StringVar(value='RURAL')
-        self.vars['nox_method'] = tk.StringVar(value='NONE')
+        self.vars['disp_env'] = _PlainVar('RURAL')
+        self.vars['nox_method'] = _PlainVar('NONE')
         
         # --- PATH ANCHORING ---
         self.project_root = Path(__file__).parent.parent.resolve()
@@ -84,18 +176,25 @@ class GUIHelper:
         self.config_dir.mkdir(exist_ok=True)
         self.data_dir = self.project_root / "data"
         self.inventory_dir = self.data_dir / "inventory"
+        self.model_output_dir = self.data_dir / "model_output"
+        self.bin_dir = self.project_root / "bin"
         
         # Default Config Path
         self.current_config_path = self.config_dir / "default.yaml"
         self.config = {}
         self.pollutant_vars = {}
         self.pollutant_configs = {}
-        self.pollutant_options = ["SO2", "NO2", "PM10", "PM2.5", "CO", "Pb", "OTHER"]
         self.aermet_completed = False
         self.is_running = False # Global lock for actions
+        self._yaml_cache = OrderedDict() # (path, mtime_ns, size) -> parsed config
+        self._general_buttons = [] # locked while an action runs
+        self._era5_buttons = []    # additionally only enabled for the ERA5 met source
+        self._widget_states = {}   # last state applied per widget path
+        self._last_save = None     # (path, config fingerprint, mtime_ns) of the last write
 
         # Queue for thread-safe logging
-        self.log_queue = queue.Queue()
+        # Bounded so a runaway process cannot grow it without limit (oldest entries are dropped)
+        self.log_queue = queue.Queue(maxsize=50000)
         
         # Load Initial Config
         self.load_config(self.current_config_path)
@@ -105,19 +204,44 @@ class GUIHelper:
         # Start the log polling loop
         self.check_log_queue()
 
+    YAML_CACHE_SIZE = 16
+
+    def _read_yaml(self, path):
+        """Parses a YAML file, reusing the cached result while the file is unchanged."""
+        st = path.stat()
+        key = (str(path), st.st_mtime_ns, st.st_size)
+        if key in self._yaml_cache:
+            self._yaml_cache.move_to_end(key)
+        else:
+            self._yaml_cache[key] = self._parse_config_file(path, st)
+            if len(self._yaml_cache) > self.YAML_CACHE_SIZE:
+                self._yaml_cache.popitem(last=False)
+        # Callers mutate self.config, so never hand out the cached object
+        return copy.deepcopy(self._yaml_cache[key])
+
+    def _parse_config_file(self, path, st):
+        if st.st_size == 0:
+            return {}
+        # One read of the whole file; libyaml decodes the UTF-8 bytes itself
+        yaml, SafeLoader, _ = _yaml()
+        return yaml.load(path.read_bytes(), Loader=SafeLoader) or {}
+
+    def _forget_yaml(self, path):
+        for key in [k for k in self._yaml_cache if k[0] == str(path)]:
+            del self._yaml_cache[key]
+
     def load_config(self, path):
         """Loads a specific YAML file into self.config"""
         self.log(f"Loading config: {path.name}...")
         if path.exists():
-            with open(path, 'r') as f:
-                try:
-                    self.config = yaml.safe_load(f)
-                    self.current_config_path = path
-                    if hasattr(self, 'notebook'):
-                        self.refresh_ui_from_config()
-                except Exception as e:
-                    self.log(f"[ERROR] Failed to load config: {e}")
-                    self.config = {}
+            try:
+                self.config = self._read_yaml(path)
+                self.current_config_path = path
+                if hasattr(self, 'notebook'):
+                    self.refresh_ui_from_config()
+            except Exception as e:
+                self.log(f"[ERROR] Failed to load config: {e}")
+                self.config = {}
         else:
             self.log("[WARNING] Config not found, using internal defaults.")
             self.config = {}
@@ -133,44 +257,25 @@ class GUIHelper:
         for k, v in defaults.items():
             if k not in self.config:
                 self.config[k] = v
+        # Everything counts as edited until the first save writes the UI back
+        self._dirty = set(self.config_fields)
 
     def save_config(self):
-        # Update config dict from UI variables
-        self.config['project']['name'] = self.vars['project_name'].get()
-        self.config['project']['station_name'] = self.vars['station_name'].get()
-        # Ensure the aermod_params dictionary exists
-        if 'aermod_params' not in self.config:
-            self.config['aermod_params'] = {}
-            
-        self.config['aermod_params']['dispersion_env'] = self.vars['disp_env'].get()
-        self.config['aermod_params']['nox_method'] = self.vars['nox_method'].get()
-        try:
-            y_str = self.vars['years'].get().strip('[] ')
-            if y_str: self.config['project']['years'] = [int(y.strip()) for y in y_str.split(',')]
-            else: self.config['project']['years'] = []
-        except: pass
-
-        self.config['location']['latitude'] = float(self.vars['lat'].get())
-        self.config['location']['longitude'] = float(self.vars['lon'].get())
-        self.config['location']['elevation'] = float(self.vars['elev'].get())
-        
-        self.config['paths']['aermet_exe'] = self.vars['aermet_exe'].get()
-        self.config['paths']['aermod_exe'] = self.vars['aermod_exe'].get()
+        # Copy only the fields edited since the last load/save from the UI into the config dict
+        for name, (section, key, convert) in self.config_fields.items():
+            if name in self._dirty:
+                self.config.setdefault(section, {})[key] = convert(self.vars[name].get())
+        self._dirty.clear()
         
-        src = self.vars['data_source'].get()
-        self.config['project']['data_source'] = src
+        src = self.config['project']['data_source']
         if src == 'USER':
-            self.config['project']['user_sfc'] = self.vars['sfc_path'].get()
-            self.config['project']['user_pfl'] = self.vars['pfl_path'].get()
-        
-        self.config['inventory']['point'] = self.vars['inv_point'].get()
-        self.config['inventory']['area'] = self.vars['inv_area'].get()
-        self.config['inventory']['line'] = self.vars['inv_line'].get()
+            self.config['project']['user_sfc'] = self._get_var('sfc_path', self.config['project'].get('user_sfc', '')).get()
+            self.config['project']['user_pfl'] = self._get_var('pfl_path', self.config['project'].get('user_pfl', '')).get()
         
         p_data = {}
         for pol in self.pollutant_options:
             if self.pollutant_vars[pol].get():
-                p_data[pol] = {'enabled': True, 'avg_times': self.pollutant_configs.get(pol, ['1', '24'])}
+                p_data[pol] = {'enabled': True, 'avg_times': self._avg_times_list(self.pollutant_configs.get(pol, self.default_avg_times))}
         self.config['aermod_params']['pollutants'] = p_data
 
         # Save Logic
@@ -179,8 +284,29 @@ class GUIHelper:
         save_path = self.config_dir / f"{proj_name}.yaml"
         
         try:
-            with open(save_path, 'w') as f:
-                yaml.dump(self.config, f, sort_keys=False)
+            # Skip the rewrite if neither the settings nor the file changed since the last save,
+            # or if the settings still match what was parsed from the file as it is on disk
+            fingerprint = hashlib.blake2b(repr(self.config).encode(), digest_size=16).digest()
+            try: st = save_path.stat()
+            except OSError: st = None
+            mtime = st.st_mtime_ns if st else None
+            if (self._last_save == (save_path, fingerprint, mtime) or
+                    (st and self._yaml_cache.get((str(save_path), st.st_mtime_ns, st.st_size)) == self.config)):
+                self._last_save = (save_path, fingerprint, mtime)
+                self.current_config_path = save_path
+                self.log(f"Configuration unchanged: {save_path.name}")
+                return
+
+            # Emit the whole document in memory, then land it with one write and an atomic rename
+            yaml, _, SafeDumper = _yaml()
+            buf = io.BytesIO()
+            yaml.dump(self.config, buf, Dumper=SafeDumper, sort_keys=False, encoding='utf-8')
+            tmp_path = save_path.with_name(save_path.name + ".tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(buf.getvalue())
+            os.replace(tmp_path, save_path)
+            self._forget_yaml(save_path)
+            self._last_save = (save_path, fingerprint, save_path.stat().st_mtime_ns)
             
             self.current_config_path = save_path
             self.log(f"[SUCCESS] Configuration saved to: {save_path.name}")
@@ -189,47 +315,61 @@ class GUIHelper:
             self.log(f"[ERROR] Save failed: {e}")
 
     def refresh_ui_from_config(self):
+        # Bind each section once (None-safe for empty sections in the YAML)
+        v = self._get_var
+        proj = self.config.get('project') or {}
+        loc = self.config.get('location') or {}
+        paths = self.config.get('paths') or {}
+        inv = self.config.get('inventory') or {}
+        prms = self.config.get('aermod_params') or {}
+        pols = prms.get('pollutants') or {}
+
         # Project
-        self.vars['project_name'].set(self.config['project'].get('name', ''))
-        self.vars['station_name'].set(self.config['project'].get('station_name', 'Station'))
-        self.vars['years'].set(str(self.config['project'].get('years', [])).strip('[]'))
-        self.vars['data_source'].set(self.config['project'].get('data_source', 'ERA5'))
+        v('project_name').set(proj.get('name', ''))
+        v('station_name').set(proj.get('station_name', 'Station'))
+        v('years').set(str(proj.get('years', [])).strip('[]'))
+        v('data_source').set(proj.get('data_source', 'ERA5'))
         
         # Location
-        loc = self.config.get('location', {})
-        self.vars['lat'].set(loc.get('latitude', 0.0))
-        self.vars['lon'].set(loc.get('longitude', 0.0))
-        self.vars['elev'].set(loc.get('elevation', 0.0))
+        v('lat').set(loc.get('latitude', 0.0))
+        v('lon').set(loc.get('longitude', 0.0))
+        v('elev').set(loc.get('elevation', 0.0))
         
         # Paths
-        paths = self.config.get('paths', {})
-        self.vars['aermet_exe'].set(paths.get('aermet_exe', ''))
-        self.vars['aermod_exe'].set(paths.get('aermod_exe', ''))
+        v('aermet_exe').set(paths.get('aermet_exe', ''))
+        v('aermod_exe').set(paths.get('aermod_exe', ''))
         
         # Inventory
-        inv = self.config.get('inventory', {})
-        self.vars['inv_point'].set(inv.get('point', ''))
-        self.vars['inv_area'].set(inv.get('area', ''))
-        self.vars['inv_line'].set(inv.get('line', ''))
+        v('inv_point').set(inv.get('point', ''))
+        v('inv_area').set(inv.get('area', ''))
+        v('inv_line').set(inv.get('line', ''))
         
         # Pollutants
-        pols = self.config.get('aermod_params', {}).get('pollutants', {})
         for pol in self.pollutant_options:
             is_checked = pol in pols
-            self.pollutant_vars[pol].set(is_checked)
+            # Only write changed values; every set() is a Tcl round trip
+            var = self._pollutant_var(pol)
+            if var.get() != is_checked:
+                var.set(is_checked)
             if is_checked:
-                self.pollutant_configs[pol] = pols[pol].get('avg_times', ['1', '24'])
+                times = pols[pol].get('avg_times')
+                self.pollutant_configs[pol] = frozenset(map(str, times)) if times else self.default_avg_times
             else:
-                self.pollutant_configs[pol] = ['1', '24']
+                self.pollutant_configs[pol] = self.default_avg_times
         
         # Control
         # Load Control Pathway parameters
-        prms = self.config.get('aermod_params', {})
-        self.vars['disp_env'].set(prms.get('dispersion_env', 'RURAL'))
-        self.vars['nox_method'].set(prms.get('nox_method', 'NONE'))
+        v('disp_env').set(prms.get('dispersion_env', 'RURAL'))
+        v('nox_method').set(prms.get('nox_method', 'NONE'))
         self.update_button_states()
 
+    def _avg_times_list(self, times):
+        """Averaging times as a list in option order (unknown entries last) for the YAML."""
+        known = [o for o in self.avg_time_options if o in times]
+        return known + sorted(times.difference(self.avg_time_options))
+
     def load_project_dialog(self):
+        from tkinter import filedialog
         f = filedialog.askopenfilename(
             initialdir=self.config_dir,
             title="Load Project Configuration",
@@ -240,17 +380,39 @@ class GUIHelper:
     # --- LOGGING SYSTEM ---
     def log(self, message):
         """Adds a message to the queue to be printed in the GUI text box."""
-        self.log_queue.put(message)
+        try:
+            self.log_queue.put_nowait(message)
+        except queue.Full:
+            try: self.log_queue.get_nowait()
+            except queue.Empty: pass
+            try: self.log_queue.put_nowait(message)
+            except queue.Full: pass # lost a race with another producer; drop this line
+
+    CONSOLE_MAX_LINES = 5000
+    CONSOLE_TRIM_SLACK = 1000
+    LOG_POLL_BUSY_MS = 30
+    LOG_POLL_IDLE_MS = 250
 
     def check_log_queue(self):
         """Polls the queue and updates the Text widget."""
-        while not self.log_queue.empty():
-            msg = self.log_queue.get()
+        # Drain everything queued so far, then touch the widget once
+        msgs = []
+        try:
+            while True:
+                msgs.append(self.log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if msgs:
             self.console.config(state='normal')
-            self.console.insert(tk.END, msg + "\n")
+            self.console.insert(tk.END, "\n".join(msgs) + "\n")
+            # Keep the widget bounded on long runs; trimming in chunks keeps it rare
+            n_lines = int(self.console.index('end-1c').split('.')[0])
+            if n_lines > self.CONSOLE_MAX_LINES + self.CONSOLE_TRIM_SLACK:
+                self.console.delete('1.0', f'{n_lines - self.CONSOLE_MAX_LINES}.0')
             self.console.see(tk.END) # Auto-scroll
             self.console.config(state='disabled')
-        self.root.after(100, self.check_log_queue)
+        # Poll quickly while output is flowing, back off when idle
+        self.root.after(self.LOG_POLL_BUSY_MS if msgs else self.LOG_POLL_IDLE_MS, self.check_log_queue)
 
     # --- PIPELINE EXECUTION ---
     def run_pipeline_action(self, action_name, success_msg=None, on_complete=None):
@@ -266,17 +428,30 @@ class GUIHelper:
         
         self.log(f"\n--- STARTING ACTION: {action_name.upper()} ---")
 
+        import subprocess
         def _run():
             try:
                 cmd = [sys.executable, "run_pipeline.py", "--action", action_name, "--config", config_name]
                 
                 process = subprocess.Popen(
                     cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, stdin=subprocess.PIPE,
-                    text=True, cwd=self.project_root, bufsize=1, universal_newlines=True
+                    cwd=self.project_root, bufsize=0
                 )
                 
-                for line in process.stdout:
-                    self.log(line.strip())
+                # Drain the pipe in large chunks (one read per burst, not per line);
+                # a trailing partial line is carried over to the next chunk
+                fd = process.stdout.fileno()
+                encoding = locale.getpreferredencoding(False)
+                carry = b""
+                while True:
+                    chunk = os.read(fd, 65536)
+                    if not chunk: break
+                    *lines, carry = (carry + chunk).split(b"\n")
+                    if lines:
+                        # One queue entry per chunk; the console joins entries with newlines anyway
+                        self.log("\n".join(line.decode(encoding, errors='replace').strip() for line in lines))
+                if carry:
+                    self.log(carry.decode(encoding, errors='replace').strip())
                 
                 process.wait()
                 
@@ -308,7 +483,7 @@ class GUIHelper:
         # --- Header ---
         header = ttk.Frame(top_frame, padding=5)
         header.pack(fill='x')
-        ttk.Label(header, text="Active Project:", font=('Arial', 10, 'bold')).pack(side='left')
+        ttk.Label(header, text="Active Project:", style='Header.TLabel').pack(side='left')
         ttk.Button(header, text="📂 Load Project", command=self.load_project_dialog).pack(side='right')
 
         # --- Notebook ---
@@ -318,31 +493,35 @@ class GUIHelper:
         self.tab_project = ttk.Frame(self.notebook); self.notebook.add(self.tab_project, text='1. Project')
         self.create_project_tab(self.tab_project)
         
+        # Remaining tabs are built the first time they are selected
         self.tab_met = ttk.Frame(self.notebook); self.notebook.add(self.tab_met, text='2. Meteorology')
-        self.create_met_tab(self.tab_met)
-        
         self.tab_inv = ttk.Frame(self.notebook); self.notebook.add(self.tab_inv, text='3. Inventory')
-        self.create_inventory_tab(self.tab_inv)
-        
         self.tab_pol = ttk.Frame(self.notebook); self.notebook.add(self.tab_pol, text='4. Model settings')
-        self.create_model_settings_tab(self.tab_pol)
-
         self.tab_post = ttk.Frame(self.notebook); self.notebook.add(self.tab_post, text='5. Post-Processing')
-        self.create_post_processing_tab(self.tab_post)
+        self._pending_tabs = {
+            str(self.tab_met): (self.tab_met, self.create_met_tab),
+            str(self.tab_inv): (self.tab_inv, self.create_inventory_tab),
+            str(self.tab_pol): (self.tab_pol, self.create_model_settings_tab),
+            str(self.tab_post): (self.tab_post, self.create_post_processing_tab),
+        }
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
         
         # --- Action Buttons ---
         btn_frame = ttk.Frame(top_frame, padding=10)
         btn_frame.pack(fill='x')
         
         self.btn_setup = ttk.Button(btn_frame, text="🛠️ Setup Env", command=self.confirm_and_setup)
+        self._general_buttons.append(self.btn_setup)
         self.btn_setup.pack(side='left', padx=5)
         ToolTip(self.btn_setup, "Downloads and compiles AERMOD & AERMET binaries.\nOnly needs to be run once per system.")
         
         self.btn_aermod = ttk.Button(btn_frame, text="🏭 Run AERMOD Model", command=self.run_aermod_model)
+        self._general_buttons.append(self.btn_aermod)
         self.btn_aermod.pack(side='left', padx=20)
         ToolTip(self.btn_aermod, "Executes the AERMOD dispersion model using the configured inputs.")
         
         self.btn_save = ttk.Button(btn_frame, text="💾 Save Config", command=self.save_config)
+        self._general_buttons.append(self.btn_save)
         self.btn_save.pack(side='right', padx=5)
         ToolTip(self.btn_save, "Saves current UI parameters to the active configuration file.")
 
@@ -350,24 +529,34 @@ class GUIHelper:
         bottom_frame = ttk.Frame(main_pane)
         main_pane.add(bottom_frame, stretch="always")
         
-        ttk.Label(bottom_frame, text="Process Output Log:", font=('Arial', 9, 'bold')).pack(anchor='w', padx=5)
+        ttk.Label(bottom_frame, text="Process Output Log:", style='Section.TLabel').pack(anchor='w', padx=5)
         
         self.console = scrolledtext.ScrolledText(bottom_frame, height=10, state='disabled', bg='#1e1e1e', fg='#00ff00', font=('Consolas', 9))
         self.console.pack(fill='both', expand=True, padx=5, pady=5)
 
-        self.root.update_idletasks()
-        try:
-            main_pane.sash_place(0, 0, 600)
-        except:
-            pass 
+        # Place the sash once Tk's own idle-time layout has run, rather than forcing
+        # a full synchronous layout pass here before the window is even mapped
+        def _place_sash():
+            try:
+                main_pane.sash_place(0, 0, 600)
+            except tk.TclError:
+                pass
+        self.root.after_idle(_place_sash)
 
         # Populate UI
         self.refresh_ui_from_config()
 
+    def _on_tab_changed(self, event=None):
+        pending = self._pending_tabs.pop(self.notebook.select(), None)
+        if pending:
+            frame, build = pending
+            build(frame)
+            self.update_button_states()
+
     # --- Actions ---
     def confirm_and_setup(self):
         if platform.system() == "Windows":
-            bin_dir = self.project_root / "bin"
+            bin_dir = self.bin_dir
             msg = (
                 "Windows OS detected.\n\n"
                 "This action will download the official pre-compiled EPA binaries:\n"
@@ -429,7 +618,8 @@ class GUIHelper:
         try:
             from src.geotiff_exporter import GeotiffExporter
             exporter = GeotiffExporter(self.config)
-            success, msg = exporter.export(plt_path)
+            # An explicit export always re-renders (site or settings may have changed)
+            success, msg = exporter.export(plt_path, overwrite=True)
             
             if success:
                 self.log(f"[SUCCESS] {msg}")
@@ -459,31 +649,28 @@ class GUIHelper:
     def toggle_met_source(self):
         self.update_button_states()
 
+    def _set_state(self, widget, state):
+        """Applies a widget state, skipping the Tcl call if it is already set."""
+        key = str(widget)
+        if self._widget_states.get(key) != state:
+            widget.config(state=state)
+            self._widget_states[key] = state
+
     def update_button_states(self):
         if self.is_running:
-            state = 'disabled'
-            if hasattr(self, 'btn_setup'): self.btn_setup.config(state=state)
-            if hasattr(self, 'btn_aermod'): self.btn_aermod.config(state=state)
-            if hasattr(self, 'btn_save'): self.btn_save.config(state=state)
-            if hasattr(self, 'btn_dl'): self.btn_dl.config(state=state)
-            if hasattr(self, 'btn_proc'): self.btn_proc.config(state=state)
-            if hasattr(self, 'btn_aermet'): self.btn_aermet.config(state=state)
-            if hasattr(self, 'btn_init_inv'): self.btn_init_inv.config(state=state)
+            for btn in self._general_buttons + self._era5_buttons:
+                self._set_state(btn, 'disabled')
             return
 
-        if hasattr(self, 'btn_setup'): self.btn_setup.config(state='normal')
-        if hasattr(self, 'btn_save'): self.btn_save.config(state='normal')
-        if hasattr(self, 'btn_init_inv'): self.btn_init_inv.config(state='normal')
-        
-        if hasattr(self, 'btn_aermod'): self.btn_aermod.config(state='normal')
+        for btn in self._general_buttons:
+            self._set_state(btn, 'normal')
 
         try:
             mode = self.vars['data_source'].get()
             era_state = 'normal' if mode == 'ERA5' else 'disabled'
             
-            if hasattr(self, 'btn_dl'): self.btn_dl.config(state=era_state)
-            if hasattr(self, 'btn_proc'): self.btn_proc.config(state=era_state)
-            if hasattr(self, 'btn_aermet'): self.btn_aermet.config(state=era_state)
+            for btn in self._era5_buttons:
+                self._set_state(btn, era_state)
             
             u_state = 'normal' if mode == 'USER' else 'disabled'
             for child in self.frm_user_met.winfo_children():
@@ -497,16 +684,15 @@ class GUIHelper:
         win = tk.Toplevel(self.root)
         win.title(f"{pollutant} Settings")
         win.geometry("300x250")
-        ttk.Label(win, text=f"Averaging Times for {pollutant}", font=('Arial', 10, 'bold')).pack(pady=10)
-        current = self.pollutant_configs.get(pollutant, ['1', '24'])
-        opts = ["1", "3", "8", "24", "ANNUAL"]
+        ttk.Label(win, text=f"Averaging Times for {pollutant}", style='Header.TLabel').pack(pady=10)
+        current = self.pollutant_configs.get(pollutant, self.default_avg_times)
         vars = {}
-        for o in opts:
+        for o in self.avg_time_options:
             v = tk.BooleanVar(value=(o in current))
             vars[o] = v
             ttk.Checkbutton(win, text=f"{o}-Hour" if o != "ANNUAL" else "Annual", variable=v).pack(anchor='w', padx=20)
         def save():
-            sel = [k for k,v in vars.items() if v.get()]
+            sel = frozenset(k for k,v in vars.items() if v.get())
             if not sel: return messagebox.showwarning("Warning", "Select at least one.")
             self.pollutant_configs[pollutant] = sel
             self.pollutant_vars[pollutant].set(True)
@@ -516,12 +702,13 @@ class GUIHelper:
     def browse_plt_file(self):
         proj_name = self.config.get('project', {}).get('name', 'MyProject')
         
-        init_dir = self.project_root / "data" / "model_output" / proj_name
+        init_dir = self.model_output_dir / proj_name
         if not init_dir.exists():
-            init_dir = self.project_root / "data" / "model_output"
+            init_dir = self.model_output_dir
         if not init_dir.exists():
             init_dir = self.project_root
 
+        from tkinter import filedialog
         f = filedialog.askopenfilename(
             initialdir=init_dir,
             title="Select AERMOD Plot File (.PLT)",
@@ -540,8 +727,8 @@ class GUIHelper:
         
         f = ttk.LabelFrame(parent, text="Paths", padding=10)
         f.pack(fill='x', pady=5, padx=10)
-        daer = self.config['paths'].get('aermet_exe', str(self.project_root / 'bin' / 'aermet'))
-        dmod = self.config['paths'].get('aermod_exe', str(self.project_root / 'bin' / 'aermod'))
+        daer = self.config['paths'].get('aermet_exe', str(self.bin_dir / 'aermet'))
+        dmod = self.config['paths'].get('aermod_exe', str(self.bin_dir / 'aermod'))
         self.add_file_picker(f, "AERMET:", "aermet_exe", daer, "EXE")
         self.add_file_picker(f, "AERMOD:", "aermod_exe", dmod, "EXE")
 
@@ -564,7 +751,7 @@ class GUIHelper:
         # --- EXISTING SOURCE FRAME ---
         f = ttk.LabelFrame(parent, text="Source", padding=10)
         f.pack(fill='both', expand=True, padx=10, pady=10)
-        self.vars['data_source'] = tk.StringVar(value=self.config['project'].get('data_source', 'ERA5'))
+        self._widget_var('data_source', self.config['project'].get('data_source', 'ERA5'))
         
         rb1 = ttk.Radiobutton(f, text="ERA5 Pipeline", variable=self.vars['data_source'], value="ERA5", command=self.toggle_met_source)
         rb1.pack(anchor='w', padx=10)
@@ -573,14 +760,17 @@ class GUIHelper:
         b_frame = ttk.Frame(f)
         b_frame.pack(fill='x', padx=30, pady=5)
         self.btn_dl = ttk.Button(b_frame, text="1. Download", command=self.run_download)
+        self._era5_buttons.append(self.btn_dl)
         self.btn_dl.pack(side='left', padx=2)
         ToolTip(self.btn_dl, "Downloads ERA5 surface and upper-air data for the selected location and years.")
         
         self.btn_proc = ttk.Button(b_frame, text="2. Process", command=self.run_met_process)
+        self._era5_buttons.append(self.btn_proc)
         self.btn_proc.pack(side='left', padx=2)
         ToolTip(self.btn_proc, "Processes raw ERA5 GRIB/NetCDF files into intermediate formats suitable for AERMET.")
         
         self.btn_aermet = ttk.Button(b_frame, text="3. Run AERMET", command=self.run_aermet)
+        self._era5_buttons.append(self.btn_aermet)
         self.btn_aermet.pack(side='left', padx=2)
         ToolTip(self.btn_aermet, "Executes AERMET to generate the final .SFC and .PFL files required by AERMOD.")
         
@@ -599,6 +789,7 @@ class GUIHelper:
         h = ttk.Frame(parent); h.pack(fill='x', padx=10, pady=10)
         
         self.btn_init_inv = ttk.Button(h, text="Init Templates", command=self.run_setup_inventory)
+        self._general_buttons.append(self.btn_init_inv)
         self.btn_init_inv.pack(side='left', padx=(0, 5))
         ToolTip(self.btn_init_inv, "Creates blank CSV templates (point, area, line) for your project if they do not exist.")
         
@@ -607,7 +798,7 @@ class GUIHelper:
         ToolTip(btn_help, "Opens the global guide on required formats and emission units.")
 
         pname = self.config['project'].get('name', 'MyProject')
-        def_path = self.data_dir / "inventory" / pname
+        def_path = self.inventory_dir / pname
         ttk.Button(h, text="📂 Open Folder", command=lambda: self.open_path(def_path)).pack(side='right')
         
         f = ttk.LabelFrame(parent, text="Files", padding=10)
@@ -622,27 +813,24 @@ class GUIHelper:
         co_frame.pack(fill='x', padx=10, pady=5)        
         
         ttk.Label(co_frame, text="Dispersion Environment:").grid(row=0, column=0, sticky='w', pady=2, padx=5)
-        env_cb = ttk.Combobox(co_frame, textvariable=self.vars['disp_env'], values=["RURAL", "URBAN"], state="readonly", width=15)
+        env_cb = ttk.Combobox(co_frame, textvariable=self._widget_var('disp_env'), values=["RURAL", "URBAN"], state="readonly", width=15)
         env_cb.grid(row=0, column=1, sticky='w', pady=2)
         ToolTip(env_cb, "Select RURAL (default) or URBAN dispersion.\nURBAN modifies boundary layer profiles for heat island effects.")
 
         ttk.Label(co_frame, text="NOx to NO2 Method:").grid(row=1, column=0, sticky='w', pady=2, padx=5)
-        nox_cb = ttk.Combobox(co_frame, textvariable=self.vars['nox_method'],values=["NONE", "ARM2", "PVMRM", "OLM"], state="readonly", width=15)
+        nox_cb = ttk.Combobox(co_frame, textvariable=self._widget_var('nox_method'),values=["NONE", "ARM2", "PVMRM", "OLM"], state="readonly", width=15)
         nox_cb.grid(row=1, column=1, sticky='w', pady=2)
         ToolTip(nox_cb, "Method for NOx to NO2 conversion.\nARM2 is the standard multi-tiered approach.")
 
         f = ttk.LabelFrame(parent, text="Pollutants", padding=10)
         f.pack(fill='both', expand=True, padx=10, pady=10)
-        saved = self.config.get('aermod_params', {}).get('pollutants', {})
         gf = ttk.Frame(f); gf.pack(fill='both', expand=True)
         r=0; c=0
         for pol in self.pollutant_options:
             pf = ttk.Frame(gf)
             pf.grid(row=r, column=c, sticky='w', padx=20, pady=10)
-            chk = pol in saved
-            self.pollutant_vars[pol] = tk.BooleanVar(value=chk)
-            if chk: self.pollutant_configs[pol] = saved[pol].get('avg_times', ['1', '24'])
-            else: self.pollutant_configs[pol] = ['1', '24']
+            # Values and averaging times are filled in by refresh_ui_from_config
+            self._pollutant_var(pol)
             
             btn = ttk.Button(pf, text="⚙️", width=3, command=lambda p=pol: self.open_pollutant_settings(p))
             btn.pack(side='left', padx=(0,5))
@@ -660,8 +848,7 @@ class GUIHelper:
         row_f.pack(fill='x', pady=10)
         
         ttk.Label(row_f, text="Output file path (.PLT):", width=20).pack(side='left')
-        self.vars['plt_file_path'] = tk.StringVar(value="")
-        ttk.Entry(row_f, textvariable=self.vars['plt_file_path']).pack(side='left', expand=True, fill='x', padx=5)
+        ttk.Entry(row_f, textvariable=self._widget_var('plt_file_path')).pack(side='left', expand=True, fill='x', padx=5)
         
         ttk.Button(row_f, text="...", width=4, command=self.browse_plt_file).pack(side='left', padx=2)
         
@@ -677,44 +864,80 @@ class GUIHelper:
         ToolTip(btn_tif, "Converts the selected .PLT file into a GIS-ready raster image (.tif).")
 
     # --- HELPERS ---
+    def _get_var(self, name, default=''):
+        """Returns the variable for a field, creating it on first use.
+        Tabs are built lazily, so a field without a widget yet is held in a _PlainVar."""
+        var = self.vars.get(name)
+        if var is None:
+            var = self.vars[name] = _PlainVar(default)
+        return var
+
+    def _widget_var(self, name, default=''):
+        """Returns a Tk StringVar for a field about to get a widget, promoting its _PlainVar."""
+        var = self._get_var(name, default)
+        if isinstance(var, _PlainVar):
+            var = self.vars[name] = tk.StringVar(value=var.get())
+            var.trace_add('write', lambda *_, n=name: self._dirty.add(n))
+        return var
+
+    def _pollutant_var(self, pol):
+        var = self.pollutant_vars.get(pol)
+        if var is None:
+            var = self.pollutant_vars[pol] = tk.BooleanVar(value=False)
+        return var
+
+    def _grid_row(self, p):
+        """Next free grid row in a form frame; the entry column (1) takes the spare width."""
+        r = p.grid_size()[1]
+        if r == 0: p.columnconfigure(1, weight=1)
+        return r
+
     def add_entry(self, p, l, v, d):
-        f=ttk.Frame(p); f.pack(fill='x', pady=2)
-        ttk.Label(f, text=l, width=15).pack(side='left')
-        val=tk.StringVar(value=str(d)); self.vars[v]=val
-        entry = ttk.Entry(f, textvariable=val)
-        entry.pack(side='right', expand=True, fill='x')
+        r = self._grid_row(p)
+        ttk.Label(p, text=l, width=15).grid(row=r, column=0, sticky='w', pady=2)
+        val=self._widget_var(v, d)
+        entry = ttk.Entry(p, textvariable=val)
+        entry.grid(row=r, column=1, sticky='ew', pady=2)
         return entry
     
     def add_file_picker(self, p, l, v, d, t):
-        f=ttk.Frame(p); f.pack(fill='x', pady=2)
-        ttk.Label(f, text=l, width=15).pack(side='left')
-        val=tk.StringVar(value=str(d)); self.vars[v]=val
-        ttk.Entry(f, textvariable=val).pack(side='left', expand=True, fill='x')
-        ttk.Button(f, text="...", width=4, command=lambda: self.browse_file(v,t)).pack(side='right')
+        r = self._grid_row(p)
+        ttk.Label(p, text=l, width=15).grid(row=r, column=0, sticky='w', pady=2)
+        val=self._widget_var(v, d)
+        ttk.Entry(p, textvariable=val).grid(row=r, column=1, sticky='ew', pady=2)
+        ttk.Button(p, text="...", width=4, command=lambda: self.browse_file(v,t)).grid(row=r, column=2, pady=2)
 
     def add_inv_row(self, p, l, v, d):
-        f=ttk.Frame(p); f.pack(fill='x', pady=2)
-        ttk.Label(f, text=l, width=10).pack(side='left')
-        val=tk.StringVar(value=str(d)); self.vars[v]=val
-        ttk.Entry(f, textvariable=val).pack(side='left', expand=True, fill='x')
-        ttk.Button(f, text="...", width=4, command=lambda: self.browse_file(v,"CSV")).pack(side='left')
-        ttk.Button(f, text="Edit", width=5, command=lambda: self.open_path(val.get())).pack(side='left')
+        r = self._grid_row(p)
+        ttk.Label(p, text=l, width=10).grid(row=r, column=0, sticky='w', pady=2)
+        val=self._widget_var(v, d)
+        ttk.Entry(p, textvariable=val).grid(row=r, column=1, sticky='ew', pady=2)
+        ttk.Button(p, text="...", width=4, command=lambda: self.browse_file(v,"CSV")).grid(row=r, column=2, pady=2)
+        ttk.Button(p, text="Edit", width=5, command=lambda: self.open_path(val.get())).grid(row=r, column=3, pady=2)
 
     def browse_file(self, v, t):
+        from tkinter import filedialog
         f = filedialog.askopenfilename(initialdir=self.project_root)
         if f: self.vars[v].set(f)
     
     def open_path(self, path):
         if not path: return
-        p = Path(path)
-        if not p.exists() and p.parent.exists(): p = p.parent
-        if platform.system() == "Windows": os.startfile(p)
-        else: subprocess.call(["xdg-open", str(p)])
+        # One stat when the target exists; the parent folder is only probed when it does not
+        p = os.fspath(path)
+        try: os.stat(p)
+        except OSError:
+            parent = os.path.dirname(p)
+            if parent and os.path.exists(parent): p = parent
+        try: self._open_native(p)
+        except OSError as e: self.log(f"[ERROR] Could not open {p}: {e}")
 
 def launch_gui():
     root = tk.Tk()
     style = ttk.Style()
     style.theme_use('clam')
+    # Named label styles, configured once and referenced by the widgets
+    style.configure('Header.TLabel', font=('Arial', 10, 'bold'))
+    style.configure('Section.TLabel', font=('Arial', 9, 'bold'))
     app = GUIHelper(root)
     root.mainloop()
 
@@ -42,6 +42,30 @@ class InventoryManager:
         # Calculate Site Center in UTM (This acts as the 0,0 origin on our AERMOD grid)
         self.center_x, self.center_y = self.transformer.transform(lon, lat)
 
+        # Inventory tables and geometries are the same for every pollutant;
+        # parse them once and only re-read emission rates per pollutant.
+        self._tables = {}
+        self._geoms = {}
+
+    def _load_table(self, kind):
+        """Returns the inventory DataFrame for 'point'/'area'/'line', or None if there is no file."""
+        if kind not in self._tables:
+            path = Path(self.inv_paths.get(kind, ''))
+            df = None
+            if path.is_file():
+                try:
+                    df = pd.read_csv(path)
+                except Exception as e:
+                    print(f"[ERROR] Failed reading {kind} sources: {e}")
+            self._tables[kind] = df
+        return self._tables[kind]
+
+    def _parse_wkt(self, wkt_str):
+        wkt_str = str(wkt_str).strip()
+        if wkt_str not in self._geoms:
+            self._geoms[wkt_str] = wkt.loads(wkt_str)
+        return self._geoms[wkt_str]
+
     def _convert_coords(self, lon, lat):
         """Converts WGS84 to UTM, then shifts to be relative to the Site Center (0,0)"""
         try:
@@ -53,10 +77,11 @@ class InventoryManager:
             print(f"[WARNING] Coordinate conversion failed for {lon}, {lat}: {e}")
             return 0.0, 0.0
 
-    def generate_all_sources(self, pollutant):
+    def generate_all_sources(self, pollutant, urban=False):
         """
         Parses inventory files, extracts WKT geometries, 
         and generates the SO block for the specified pollutant.
+        If urban is True, URBANSRC is emitted ahead of SRCGROUP as AERMOD requires.
         """
         so_block = ["SO STARTING"]
         src_ids = []
@@ -64,10 +89,9 @@ class InventoryManager:
         # ==========================================
         # 1. POINT SOURCES
         # ==========================================
-        pt_path = Path(self.inv_paths.get('point', ''))
-        if pt_path.exists():
+        df = self._load_table('point')
+        if df is not None:
             try:
-                df = pd.read_csv(pt_path)
                 for _, row in df.iterrows():
                     rate = float(row.get(pollutant, 0.0)) if pd.notna(row.get(pollutant)) else 0.0
                     
@@ -76,7 +100,7 @@ class InventoryManager:
                         src_ids.append(sid)
                         
                         # Parse WKT Point
-                        geom = wkt.loads(str(row['WKT']).strip())
+                        geom = self._parse_wkt(row['WKT'])
                         x, y = self._convert_coords(geom.x, geom.y)
                         
                         elev = float(row.get('elevation', 0.0))
@@ -93,10 +117,9 @@ class InventoryManager:
         # ==========================================
         # 2. AREA SOURCES (Now handles True Polygons)
         # ==========================================
-        ar_path = Path(self.inv_paths.get('area', ''))
-        if ar_path.exists():
+        df = self._load_table('area')
+        if df is not None:
             try:
-                df = pd.read_csv(ar_path)
                 for _, row in df.iterrows():
                     rate = float(row.get(pollutant, 0.0)) if pd.notna(row.get(pollutant)) else 0.0
                     
@@ -105,7 +128,7 @@ class InventoryManager:
                         src_ids.append(sid)
                         
                         # Parse WKT Polygon
-                        geom = wkt.loads(str(row['WKT']).strip())
+                        geom = self._parse_wkt(row['WKT'])
                         
                         # Extract the vertices (exterior ring)
                         coords = list(geom.exterior.coords)
@@ -144,10 +167,9 @@ class InventoryManager:
         # ==========================================
         # 3. LINE SOURCES
         # ==========================================
-        ln_path = Path(self.inv_paths.get('line', ''))
-        if ln_path.exists():
+        df = self._load_table('line')
+        if df is not None:
             try:
-                df = pd.read_csv(ln_path)
                 for _, row in df.iterrows():
                     rate = float(row.get(pollutant, 0.0)) if pd.notna(row.get(pollutant)) else 0.0
                     
@@ -156,7 +178,7 @@ class InventoryManager:
                         src_ids.append(sid)
                         
                         # Parse WKT Linestring
-                        geom = wkt.loads(str(row['WKT']).strip())
+                        geom = self._parse_wkt(row['WKT'])
                         start_coord = geom.coords[0]
                         end_coord = geom.coords[-1]
                         
@@ -176,14 +198,17 @@ class InventoryManager:
         # ==========================================
         # GROUPING
         # ==========================================
-        if src_ids:
-            # 'ALL' is a reserved group name. Do not list individual IDs after it.
-            so_block.append("   SRCGROUP ALL")
-        else:
+        if not src_ids:
             print(f"[WARNING] No active sources found for {pollutant}. Adding dummy source.")
             so_block.append("   LOCATION DUMMY POINT 0.0 0.0 0.0")
             so_block.append("   SRCPARAM DUMMY 0.0 10.0 300.0 1.0 1.0")
-            so_block.append("   SRCGROUP ALL")
+
+        # URBANSRC must come BEFORE the SRCGROUP keyword
+        if urban:
+            so_block.append("   URBANSRC  ALL")
+
+        # 'ALL' is a reserved group name. Do not list individual IDs after it.
+        so_block.append("   SRCGROUP ALL")
             
         so_block.append("SO FINISHED")
         
@@ -20,14 +20,39 @@ import os
 from pathlib import Path
 import shutil
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# CDS processes a handful of requests per user at a time; keep that many in flight
+MAX_PARALLEL_REQUESTS = 6
+
+SURFACE_VARIABLES = [
+    '2m_temperature', '2m_dewpoint_temperature', 'surface_pressure',
+    '10m_u_component_of_wind', '10m_v_component_of_wind',
+    'total_cloud_cover', 'boundary_layer_height',
+    'forecast_surface_roughness', 'surface_sensible_heat_flux',
+    'friction_velocity'
+]
+
+UPPER_AIR_LEVELS = ['1000', '975', '950', '925', '900', '875', '850', '825',
+                    '800', '775', '750', '700', '650', '600', '550', '500']
 
 class ERA5Downloader:
     def __init__(self, overwrite=False):
         self.force_overwrite = overwrite
         self.client = cdsapi.Client()
+        self._local = threading.local()
         self.project_root = Path(__file__).parent.parent
         self.met_root = self.project_root / "data" / "met"
 
+    def _get_client(self):
+        """Returns a CDS client owned by the calling thread."""
+        if threading.current_thread() is threading.main_thread():
+            return self.client
+        if not hasattr(self._local, 'client'):
+            self._local.client = cdsapi.Client()
+        return self._local.client
+
     def _get_storage_dir(self, station_name):
         store_dir = self.met_root / "raw" / station_name
         store_dir.mkdir(parents=True, exist_ok=True)
@@ -46,9 +71,8 @@ class ERA5Downloader:
         except: pass
 
         final_with_ext = final_path.with_suffix(ext)
-        if final_with_ext.exists(): os.remove(final_with_ext)
-            
-        temp_path.rename(final_with_ext)
+        # Atomic overwrite: temp file sits next to its target, so one rename suffices
+        os.replace(temp_path, final_with_ext)
         print(f"    -> Saved as: {final_with_ext.name}")
 
     def _check_existing_batch(self, save_dir, year, prefix):
@@ -89,22 +113,21 @@ class ERA5Downloader:
                 print("        -> Refreshing data.")
                 return True
 
-    def download_surface(self, year, station_name, lat, lon, buffer=0.25):
-        save_dir = self._get_storage_dir(station_name)
-        print(f"\n[DOWNLOAD] Surface Data for {year} -> {save_dir.name}")
-
-        # Prefix matched to your files: 'era5_sfc'
-        batch_overwrite = self._check_existing_batch(save_dir, year, "era5_sfc")
-        area = [lat + buffer, lon - buffer, lat - buffer, lon + buffer]
+    def _plan_requests(self, save_dir, year, prefix, dataset, build_request):
+        """
+        Resolves existing files for one year and returns the outstanding
+        (dataset, request, final_path_base) jobs, one per month.
+        """
+        batch_overwrite = self._check_existing_batch(save_dir, year, prefix)
+        jobs = []
 
         for month in range(1, 13):
             month_str = f"{month:02d}"
             # MATCHING YOUR NAMING CONVENTION
-            base_name = f"era5_sfc_{year}_{month_str}"
-            final_path_base = save_dir / base_name
-            
+            base_name = f"{prefix}_{year}_{month_str}"
+
             exists = (save_dir / f"{base_name}.nc").exists() or (save_dir / f"{base_name}.zip").exists()
-            
+
             if exists:
                 if batch_overwrite:
                     if (save_dir / f"{base_name}.nc").exists(): os.remove(save_dir / f"{base_name}.nc")
@@ -113,78 +136,76 @@ class ERA5Downloader:
                     print(f"    -> Skipping {base_name} (Exists)")
                     continue
 
-            print(f"    -> Requesting {base_name}...")
-            temp_file = save_dir / f"{base_name}_temp"
-            
-            try:
-                self.client.retrieve(
-                    'reanalysis-era5-single-levels',
-                    {
-                        'product_type': 'reanalysis', 'format': 'netcdf',
-                        'variable': [
-                            '2m_temperature', '2m_dewpoint_temperature', 'surface_pressure',
-                            '10m_u_component_of_wind', '10m_v_component_of_wind',
-                            'total_cloud_cover', 'boundary_layer_height',
-                            'forecast_surface_roughness', 'surface_sensible_heat_flux',
-                            'friction_velocity'
-                        ],
-                        'year': str(year), 'month': month_str,
-                        'day': [f"{i:02d}" for i in range(1, 32)],
-                        'time': [f"{i:02d}:00" for i in range(24)],
-                        'area': area,
-                    },
-                    str(temp_file)
-                )
-                self._smart_rename(temp_file, final_path_base)
-            except Exception as e:
-                print(f"[ERROR] Failed {base_name}: {e}")
-                if temp_file.exists(): os.remove(temp_file)
+            jobs.append((dataset, build_request(year, month_str), save_dir / base_name))
+        return jobs
 
-    def download_upper_air(self, year, station_name, lat, lon, buffer=0.25):
+    def _plan_surface(self, year, station_name, lat, lon, buffer):
+        save_dir = self._get_storage_dir(station_name)
+        print(f"\n[DOWNLOAD] Surface Data for {year} -> {save_dir.name}")
+        area = [lat + buffer, lon - buffer, lat - buffer, lon + buffer]
+
+        def build_request(year, month_str):
+            return {
+                'product_type': 'reanalysis', 'format': 'netcdf',
+                'variable': SURFACE_VARIABLES,
+                'year': str(year), 'month': month_str,
+                'day': [f"{i:02d}" for i in range(1, 32)],
+                'time': [f"{i:02d}:00" for i in range(24)],
+                'area': area,
+            }
+
+        # Prefix matched to your files: 'era5_sfc'
+        return self._plan_requests(save_dir, year, "era5_sfc", 'reanalysis-era5-single-levels', build_request)
+
+    def _plan_upper_air(self, year, station_name, lat, lon, buffer):
         save_dir = self._get_storage_dir(station_name)
         print(f"\n[DOWNLOAD] Upper Air Data for {year} -> {save_dir.name}")
-        
-        # Prefix matched to your files: 'era5_ua'
-        batch_overwrite = self._check_existing_batch(save_dir, year, "era5_ua")
-        
         area = [lat + buffer, lon - buffer, lat - buffer, lon + buffer]
-        levels = ['1000', '975', '950', '925', '900', '875', '850', '825', 
-                  '800', '775', '750', '700', '650', '600', '550', '500']
 
-        for month in range(1, 13):
-            month_str = f"{month:02d}"
-            # MATCHING YOUR NAMING CONVENTION
-            base_name = f"era5_ua_{year}_{month_str}"
-            final_path_base = save_dir / base_name
-            
-            exists = (save_dir / f"{base_name}.nc").exists() or (save_dir / f"{base_name}.zip").exists()
-            
-            if exists:
-                if batch_overwrite:
-                    if (save_dir / f"{base_name}.nc").exists(): os.remove(save_dir / f"{base_name}.nc")
-                    if (save_dir / f"{base_name}.zip").exists(): os.remove(save_dir / f"{base_name}.zip")
-                else:
-                    print(f"    -> Skipping {base_name} (Exists)")
-                    continue
+        def build_request(year, month_str):
+            return {
+                'product_type': 'reanalysis', 'format': 'netcdf',
+                'variable': ['temperature', 'geopotential'],
+                'pressure_level': UPPER_AIR_LEVELS,
+                'year': str(year), 'month': month_str,
+                'day': [f"{i:02d}" for i in range(1, 32)],
+                'time': ['00:00', '06:00', '12:00', '18:00'],
+                'area': area,
+            }
+
+        # Prefix matched to your files: 'era5_ua'
+        return self._plan_requests(save_dir, year, "era5_ua", 'reanalysis-era5-pressure-levels', build_request)
+
+    def _retrieve(self, dataset, request, final_path_base):
+        base_name = final_path_base.name
+        print(f"    -> Requesting {base_name}...")
+        temp_file = final_path_base.with_name(f"{base_name}_temp")
 
-            print(f"    -> Requesting {base_name}...")
-            temp_file = save_dir / f"{base_name}_temp"
-            
-            try:
-                self.client.retrieve(
-                    'reanalysis-era5-pressure-levels',
-                    {
-                        'product_type': 'reanalysis', 'format': 'netcdf',
-                        'variable': ['temperature', 'geopotential'],
-                        'pressure_level': levels,
-                        'year': str(year), 'month': month_str,
-                        'day': [f"{i:02d}" for i in range(1, 32)],
-                        'time': ['00:00', '06:00', '12:00', '18:00'],
-                        'area': area,
-                    },
-                    str(temp_file)
-                )
-                self._smart_rename(temp_file, final_path_base)
-            except Exception as e:
-                print(f"[ERROR] Failed {base_name}: {e}")
-                if temp_file.exists(): os.remove(temp_file)
+        try:
+            self._get_client().retrieve(dataset, request, str(temp_file))
+            self._smart_rename(temp_file, final_path_base)
+        except Exception as e:
+            print(f"[ERROR] Failed {base_name}: {e}")
+            if temp_file.exists(): os.remove(temp_file)
+
+    def _run_requests(self, jobs):
+        """Submits all jobs at once so they queue concurrently on the CDS side."""
+        if not jobs: return
+        print(f"\n[DOWNLOAD] Submitting {len(jobs)} requests ({min(MAX_PARALLEL_REQUESTS, len(jobs))} in parallel)...")
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_REQUESTS, len(jobs))) as ex:
+            for _ in ex.map(lambda job: self._retrieve(*job), jobs):
+                pass
+
+    def download_surface(self, year, station_name, lat, lon, buffer=0.25):
+        self._run_requests(self._plan_surface(year, station_name, lat, lon, buffer))
+
+    def download_upper_air(self, year, station_name, lat, lon, buffer=0.25):
+        self._run_requests(self._plan_upper_air(year, station_name, lat, lon, buffer))
+
+    def download_all(self, years, station_name, lat, lon, buffer=0.25):
+        """Queues surface and upper air requests for every year in one batch."""
+        jobs = []
+        for year in years:
+            jobs += self._plan_surface(year, station_name, lat, lon, buffer)
+            jobs += self._plan_upper_air(year, station_name, lat, lon, buffer)
+        self._run_requests(jobs)
@@ -86,8 +86,10 @@ class SurfaceProcessor(BaseProcessor):
                         temp_extract.mkdir(exist_ok=True)
                         with zipfile.ZipFile(fpath_zip, 'r') as z:
                             z.extractall(temp_extract)
+                            # The archive already lists its members; no directory scan needed
+                            nc_files = [temp_extract / n for n in z.namelist() if n.endswith(".nc")]
                         sub_dfs = []
-                        for nc in temp_extract.glob("*.nc"):
+                        for nc in nc_files:
                             ds = xr.open_dataset(nc)
                             if 'valid_time' in ds.variables: ds = ds.rename({'valid_time': 'time'})
                             ds = ds.sel(latitude=lat, longitude=lon, method='nearest')
@@ -193,20 +195,21 @@ class UpperAirProcessor(BaseProcessor):
                           f"{len(sorted_group):4d}\n")
                 f.write(header)
 
-                for i, (idx, row) in enumerate(sorted_group.iterrows()):
+                # itertuples yields lightweight namedtuples instead of a Series per row
+                for i, row in enumerate(sorted_group.itertuples(index=False)):
                     lvl_type = 11 if i == 0 else 10
-                    press_pa = int(row['press_int'] * 100)
-                    gph = int(row['height_m']) if pd.notna(row['height_m']) else -9999
+                    press_pa = int(row.press_int * 100)
+                    gph = int(row.height_m) if pd.notna(row.height_m) else -9999
                     if gph > 99999: gph = 99999
-                    temp = int(row['temp_c'] * 10) if pd.notna(row['temp_c']) else -9999
-                    if pd.notna(row['dewpt_c']) and pd.notna(row['temp_c']):
-                        dep = int(max(0, row['temp_c'] - row['dewpt_c']) * 10)
+                    temp = int(row.temp_c * 10) if pd.notna(row.temp_c) else -9999
+                    if pd.notna(row.dewpt_c) and pd.notna(row.temp_c):
+                        dep = int(max(0, row.temp_c - row.dewpt_c) * 10)
                     else: dep = -9999
                     
-                    wdir = int(row['wind_dir']) if pd.notna(row['wind_dir']) else -9999
-                    if wdir == 0 and row['wind_spd_knots'] > 0: wdir = 360 # Fix for UA too
+                    wdir = int(row.wind_dir) if pd.notna(row.wind_dir) else -9999
+                    if wdir == 0 and row.wind_spd_knots > 0: wdir = 360 # Fix for UA too
                     
-                    wspd = int(row['wind_spd_knots'] * 0.514444 * 10) if pd.notna(row['wind_spd_knots']) else -9999
+                    wspd = int(row.wind_spd_knots * 0.514444 * 10) if pd.notna(row.wind_spd_knots) else -9999
 
                     line = (f"{lvl_type:2d} -9999 {press_pa:6d} {gph:5d} {temp:5d} -9999 {dep:5d} {wdir:5d} {wspd:5d}\n")
                     f.write(line)
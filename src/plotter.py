@@ -16,12 +16,12 @@ class AermodPlotter:
             return False, f"Could not find {file_path.name}."
 
         try:
-            # Pandas 2.0+ compatibility using regex separator
-            df = pd.read_csv(file_path, sep=r'\s+', comment='*', header=None)
-            
+            # Pandas 2.0+ compatibility using regex separator (r'\s+' stays on the C engine)
             # AERMOD PLT columns: X, Y, CONC, Z_ELEV, Z_HILL, Z_FLAG, AVE, GRP, DATE
-            df = df.iloc[:, :3]
-            df.columns = ['x', 'y', 'conc']
+            # Only the first three are parsed, with fixed dtypes (no type inference)
+            df = pd.read_csv(file_path, sep=r'\s+', comment='*', header=None,
+                             usecols=[0, 1, 2], names=['x', 'y', 'conc'],
+                             dtype=np.float64, engine='c')
             
         except Exception as e:
             return False, f"Failed to parse PLT file: {e}"
@@ -57,12 +57,17 @@ def setup_inventory(config):
     
     for filename, content in templates.items():
         file_path = inv_dir / filename
-        if not file_path.exists():
-            with open(file_path, 'w') as f:
-                f.write(content)
-            print(f"  [CREATED] {filename}")
-        else:
+        # O_EXCL makes the create itself the existence check: one open per template, never an overwrite
+        try:
+            fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
             print(f"  [EXISTS]  {filename} (Skipped to prevent overwriting)")
+            continue
+        try:
+            os.write(fd, content.encode('utf-8'))
+        finally:
+            os.close(fd)
+        print(f"  [CREATED] {filename}")
             
     print(f"Templates are located in: {inv_dir}")
 